@@ -0,0 +1,131 @@
+#Importamos las librerías necesarias
+import polars as pl
+import logging
+from pathlib import Path
+from pydantic import BaseModel
+from typing import Dict, List, Optional, Union
+from GetFrame import RowFilter
+from SourceFrame import InputSource
+from DataPreProcessing import FeatureEngineer, SaveFrame, FrameUtils, PlanCompiler
+
+#Config del logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s-%(levelname)s-%(message)s')
+logger = logging.getLogger(__name__)
+
+class AnalysisCache: 
+    def __init__(self, model: BaseModel):
+        self.salida = Path(model.Paths.output_file)
+        self.parametros = model.Analysis_Params
+    
+    def clave_cache(self, fuente: Union[str, Path], frame: Union[pl.DataFrame, pl.LazyFrame]) -> Optional[str]: 
+        #La llave combina los archivos de la fuente (ruta, tamaño, mtime), el plan analizado y los parámetros del análisis
+        fuente = InputSource(fuente)
+        if not fuente.archivos() or not all(archivo.exists() for archivo in fuente.archivos()): 
+            return None
+        
+        contexto = PlanCompiler.identidad_frame(frame) + self.parametros.model_dump_json()
+        return fuente.huella_hash(contexto=contexto)[:16]
+    
+    def directorio(self, clave: str) -> Path: 
+        #Los resultados se guardan junto a la salida limpia
+        return self.salida.parent / f'{self.salida.stem}_analisis-{clave}'
+    
+    def leer(self, nombres: List[str], clave: Optional[str]) -> Optional[Dict[str, pl.DataFrame]]: 
+        if clave is None: 
+            return None
+        
+        directorio = self.directorio(clave=clave)
+        if not all((directorio / f'{nombre}.parquet').exists() for nombre in nombres): 
+            return None
+        
+        logger.info(f'Se leyeron los resultados del análisis desde la cache {directorio.name}')
+        return {nombre: pl.read_parquet(directorio / f'{nombre}.parquet') for nombre in nombres}
+    
+    def guardar(self, resultados: Dict[str, pl.DataFrame], clave: Optional[str]) -> None: 
+        #Sin una fuente en disco no hay contra qué invalidar la cache
+        if clave is None: 
+            return
+        
+        directorio = self.directorio(clave=clave)
+        directorio.mkdir(parents=True, exist_ok=True)
+        
+        for nombre, resultado in resultados.items(): 
+            ruta_temporal = directorio / f'{nombre}.parquet.tmp'
+            resultado.write_parquet(ruta_temporal)
+            ruta_temporal.replace(directorio / f'{nombre}.parquet')
+        logger.info(f'Se guardaron los resultados del análisis en {directorio.name}')
+
+class AnalysisStage: 
+    columna_total = 'total_sales'
+    
+    def __init__(self, model: BaseModel):
+        self.model = model
+        self.parametros = model.Analysis_Params
+        #Las columnas de grupos salen de las pruebas de hipótesis, plataformas en la primera y géneros en la segunda
+        self.columna_plataforma = model.Hypotesis_Testing.test_1.group_column
+        self.columna_genero = model.Hypotesis_Testing.test_2.group_column
+        self.filtro = RowFilter(model=model).filtro_frame()
+        self.feature = FeatureEngineer(model=model)
+        self.cache = AnalysisCache(model=model)
+    
+    def expr_ventas(self, columnas: List[str]) -> pl.Expr: 
+        #Se prefiere un total ya calculado (la columna de Feature_Engineer o total_sales), si no la suma de las regiones
+        if self.feature.operacion == 'sum' and self.feature.nombre in columnas: 
+            return pl.col(self.feature.nombre)
+        if self.columna_total in columnas: 
+            return pl.col(self.columna_total)
+        return pl.sum_horizontal(self.parametros.regions)
+    
+    def frame_analisis(self, frame: Union[pl.DataFrame, pl.LazyFrame]) -> pl.LazyFrame: 
+        frame = frame.lazy()
+        if self.filtro is not None: 
+            frame = frame.filter(self.filtro)
+        return frame.with_columns(self.expr_ventas(columnas=FrameUtils.columnas(frame)).alias('ventas'))
+    
+    def ventas_por(self, frame: pl.LazyFrame, columna: str) -> pl.LazyFrame: 
+        #Un solo group_by agrega las ventas totales y las de todas las regiones, lo comparten todos los rankings
+        return frame.group_by(columna).agg(
+            [pl.col('ventas').sum()] + [pl.col(region).sum() for region in self.parametros.regions]
+        )
+    
+    def columnas_score(self, frame: pl.LazyFrame) -> List[str]: 
+        excluir = {*self.parametros.regions, *(self.feature.columnas), self.feature.nombre, self.columna_total, self.parametros.year_column, 'ventas'}
+        return [col for col in FrameUtils.columnas(frame.select(pl.selectors.numeric())) if col not in excluir]
+    
+    def planes(self, frame: Union[pl.DataFrame, pl.LazyFrame]) -> Dict[str, pl.LazyFrame]: 
+        frame = self.frame_analisis(frame=frame)
+        plataformas = self.ventas_por(frame=frame, columna=self.columna_plataforma)
+        generos = self.ventas_por(frame=frame, columna=self.columna_genero)
+        
+        planes = {
+            'top_plataformas': plataformas.select([self.columna_plataforma, 'ventas']).top_k(self.parametros.top_platforms_count, by='ventas')
+        }
+        for region in self.parametros.regions: 
+            planes[f'top_plataformas_{region}'] = plataformas.select([self.columna_plataforma, region]).top_k(self.parametros.top_regional_count, by=region)
+            planes[f'top_generos_{region}'] = generos.select([self.columna_genero, region]).top_k(self.parametros.top_regional_count, by=region)
+        
+        plataforma_popular = frame.filter(pl.col(self.columna_plataforma) == self.parametros.popular_platform_corr)
+        planes['correlacion_plataforma'] = plataforma_popular.select(
+            [pl.corr(col, 'ventas').alias(col) for col in self.columnas_score(frame=frame)]
+        )
+        return planes
+    
+    def pipeline_analisis(self, 
+        frame: Optional[Union[pl.DataFrame, pl.LazyFrame]]=None, 
+        fuente: Optional[Union[str, Path]]=None) -> Dict[str, pl.DataFrame]: 
+        
+        #Sin frame se analiza la salida limpia, un frame externo solo usa la cache si se indica de qué archivos viene
+        if frame is None: 
+            frame = SaveFrame(model=self.model).leer_salida()
+            fuente = self.model.Paths.output_file
+        
+        planes = self.planes(frame=frame)
+        clave = self.cache.clave_cache(fuente=fuente, frame=frame) if fuente is not None else None
+        resultados = self.cache.leer(nombres=list(planes.keys()), clave=clave)
+        if resultados is not None: 
+            return resultados
+        
+        #collect_all ejecuta todos los planes juntos y reutiliza los group_by compartidos
+        resultados = dict(zip(planes.keys(), pl.collect_all(list(planes.values()), engine='streaming')))
+        self.cache.guardar(resultados=resultados, clave=clave)
+        return resultados
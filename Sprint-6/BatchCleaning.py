@@ -0,0 +1,255 @@
+#Importamos las librerías necesarias
+import os
+import argparse
+import logging
+import multiprocessing
+import psutil
+from pathlib import Path
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+from LazyPrefect import task, flow
+from ReadFile import ReadConfig
+from GetFrame import FrameCollector
+from DataPreProcessing import DataCleaning
+
+#Config del logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s-%(levelname)s-%(message)s')
+logger = logging.getLogger(__name__)
+
+@contextmanager
+def hilos_trabajadores(hilos: int) -> Iterator[None]: 
+    #polars lee POLARS_MAX_THREADS al importarse, antes que cualquier initializer del pool, los procesos lo heredan al crearse
+    #El entorno del llamador se restaura al cerrar el pool y un valor ya definido por el usuario se respeta
+    previo = os.environ.get('POLARS_MAX_THREADS')
+    if previo is None: 
+        os.environ['POLARS_MAX_THREADS'] = str(hilos)
+    try: 
+        yield
+    finally: 
+        if previo is None: 
+            os.environ.pop('POLARS_MAX_THREADS', None)
+
+def limpiar_config(archivo: str, 
+    columnas_representativas: List[str], 
+    umbral: float=0.4, 
+    min_proportion: int=45, 
+    memoria_maxima_mb: Optional[int]=None) -> Dict[str, Any]: 
+    
+    #Se ejecuta en el proceso o hilo del trabajo, el config ya validado se lee desde la cache
+    model = ReadConfig(archivo=archivo).read_config()
+    
+    #FrameCollector elige eager, lazy o streaming con la memoria que el lote le dejó a este trabajo
+    if memoria_maxima_mb is not None: 
+        limite = model.Memory_Params.memoria_maxima_mb
+        model.Memory_Params.memoria_maxima_mb = memoria_maxima_mb if limite is None else min(limite, memoria_maxima_mb)
+    collector = FrameCollector(model=model)
+    frame = collector.get_frame()
+    
+    DataCleaning(frame=frame, model=model, modo=collector.modo, reutilizar_decisiones=True).pipeline_data_cleaning(
+        columas_representativas=columnas_representativas,
+        umbral=umbral,
+        min_proportion=min_proportion,
+        guardar=True
+    )
+    return {'archivo': archivo, 'estado': 'completado', 'modo': collector.modo, 'salida': str(model.Paths.output_file)}
+
+@task(name='Limpieza De Config')
+def tarea_limpieza(archivo: str, 
+    columnas_representativas: List[str], 
+    umbral: float=0.4, 
+    min_proportion: int=45, 
+    memoria_maxima_mb: Optional[int]=None) -> Dict[str, Any]: 
+    
+    return limpiar_config(
+        archivo=archivo, 
+        columnas_representativas=columnas_representativas, 
+        umbral=umbral, 
+        min_proportion=min_proportion, 
+        memoria_maxima_mb=memoria_maxima_mb
+    )
+
+class BatchConfigs: 
+    extensiones = ['.yaml', '.yml', '.toml']
+    
+    def __init__(self, configs: Union[str, Path, List[Union[str, Path]]]):
+        self.configs = [configs] if isinstance(configs, (str, Path)) else list(configs)
+    
+    def archivos(self) -> List[Path]: 
+        #Un directorio aporta todos sus configs yaml/toml, ordenados para que el lote sea reproducible
+        archivos = []
+        for config in self.configs: 
+            ruta = Path(config)
+            if ruta.is_dir(): 
+                archivos.extend(sorted(archivo for archivo in ruta.iterdir() if archivo.suffix in self.extensiones))
+            else: 
+                archivos.append(ruta)
+        
+        if not archivos: 
+            raise FileNotFoundError('No se encontraron archivos yaml o toml para el lote')
+        return list(dict.fromkeys(archivos))
+    
+    def validar(self) -> Dict[str, Any]: 
+        #Cada config se valida y se estima su memoria antes de lanzar cualquier trabajo
+        trabajos = []
+        errores = {}
+        salidas = {}
+        for archivo in self.archivos(): 
+            try: 
+                model = ReadConfig(archivo=str(archivo)).read_config()
+                memoria = FrameCollector(model=model).estimar_memoria()
+            except Exception as e: 
+                logger.error(f'El config {archivo.name} no es válido, se excluye del lote: {str(e)}')
+                errores[str(archivo)] = str(e)
+                continue
+            
+            salida = str(Path(model.Paths.output_file).resolve())
+            if salida in salidas: 
+                logger.error(f'El config {archivo.name} escribe en la misma salida que {salidas[salida]}, se excluye del lote')
+                errores[str(archivo)] = f'La salida {salida} ya la usa el config {salidas[salida]}'
+                continue
+            
+            salidas[salida] = archivo.name
+            trabajos.append({'archivo': str(archivo), 'memoria': memoria})
+            logger.info(f'Config {archivo.name} validado: memoria estimada {memoria/1024**2:.2f} MB')
+        
+        return {'trabajos': trabajos, 'errores': errores}
+
+class BatchCleaning: 
+    def __init__(self,
+        configs: Union[str, Path, List[Union[str, Path]]],
+        columnas_representativas: List[str],
+        umbral: float=0.4,
+        min_proportion: int=45,
+        max_workers: Optional[int]=None,
+        memoria_maxima_mb: Optional[int]=None,
+        ejecutor: str='procesos'):
+        
+        if ejecutor not in ['procesos', 'prefect']: 
+            raise ValueError(f'El ejecutor {ejecutor} no existe, usa procesos o prefect')
+        
+        self.configs = BatchConfigs(configs=configs)
+        self.col_rep = columnas_representativas
+        self.umbral = umbral
+        self.min_proportion = min_proportion
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.memoria_maxima_mb = memoria_maxima_mb
+        self.ejecutor = ejecutor
+    
+    def memoria_lote(self) -> int: 
+        #Se mide una sola vez antes de lanzar trabajos, después la memoria libre ya incluye los que corren
+        memoria_disponible = psutil.virtual_memory().available
+        
+        if self.memoria_maxima_mb is not None: 
+            memoria_disponible = min(memoria_disponible, self.memoria_maxima_mb*1024**2)
+        return memoria_disponible
+    
+    def parametros(self, trabajo: Dict[str, Any]) -> Dict[str, Any]: 
+        return {
+            'archivo': trabajo['archivo'],
+            'columnas_representativas': self.col_rep,
+            'umbral': self.umbral,
+            'min_proportion': self.min_proportion,
+            'memoria_maxima_mb': max(1, trabajo['presupuesto']//1024**2)
+        }
+    
+    def planificar(self, trabajos: List[Dict[str, Any]], lanzar: Callable, esperar: Callable) -> Dict[str, Dict[str, Any]]: 
+        #Los trabajos grandes salen primero y los chicos rellenan la memoria que queda libre
+        pendientes = sorted(trabajos, key=lambda trabajo: trabajo['memoria'], reverse=True)
+        presupuesto = self.memoria_lote()
+        logger.info(f'Lote de {len(trabajos)} configs: presupuesto de memoria {presupuesto/1024**2:.2f} MB, máximo {self.max_workers} trabajos a la vez')
+        
+        en_curso = {}
+        en_uso = 0
+        resultados = {}
+        while pendientes or en_curso: 
+            for trabajo in list(pendientes): 
+                if len(en_curso) >= self.max_workers: 
+                    break
+                
+                #Cada trabajo recibe la memoria que queda libre, uno más grande que todo el presupuesto corre solo y FrameCollector lo lee en streaming
+                if en_uso + trabajo['memoria'] <= presupuesto or not en_curso: 
+                    pendientes.remove(trabajo)
+                    trabajo['presupuesto'] = presupuesto - en_uso
+                    en_curso[lanzar(trabajo)] = trabajo
+                    en_uso += trabajo['memoria']
+                    logger.info(f'Se lanzó {Path(trabajo["archivo"]).name}: memoria en uso {en_uso/1024**2:.2f} MB de {presupuesto/1024**2:.2f} MB')
+            
+            for futuro in esperar(list(en_curso)): 
+                trabajo = en_curso.pop(futuro)
+                en_uso -= trabajo['memoria']
+                try: 
+                    resultados[trabajo['archivo']] = futuro.result()
+                    logger.info(f'Terminó la limpieza de {Path(trabajo["archivo"]).name}')
+                except Exception as e: 
+                    logger.error(f'Falló la limpieza de {Path(trabajo["archivo"]).name}: {str(e)}')
+                    resultados[trabajo['archivo']] = {'archivo': trabajo['archivo'], 'estado': 'error', 'error': str(e)}
+        
+        return resultados
+    
+    def pipeline_procesos(self, trabajos: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]: 
+        #Polars usa todos los núcleos por proceso, se reparten entre los trabajos para no saturar el CPU
+        hilos = max(1, (os.cpu_count() or 1)//self.max_workers)
+        
+        #spawn evita heredar con fork el pool de hilos de polars del proceso principal
+        with hilos_trabajadores(hilos=hilos), ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context('spawn')) as pool: 
+            return self.planificar(
+                trabajos=trabajos,
+                lanzar=lambda trabajo: pool.submit(limpiar_config, **self.parametros(trabajo)),
+                esperar=lambda futuros: wait(futuros, return_when=FIRST_COMPLETED).done
+            )
+    
+    @flow(name='Pipeline Limpieza De Datos Por Lotes')
+    def pipeline_prefect(self, trabajos: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]: 
+        from prefect.futures import wait as esperar_prefect
+        from prefect.task_runners import ThreadPoolTaskRunner
+        
+        def esperar(futuros: List[Any]) -> set: 
+            while True: 
+                terminados = esperar_prefect(futuros, timeout=1).done
+                if terminados: 
+                    return terminados
+        
+        with ThreadPoolTaskRunner(max_workers=self.max_workers) as runner: 
+            return self.planificar(
+                trabajos=trabajos,
+                lanzar=lambda trabajo: runner.submit(tarea_limpieza.compilar(), parameters=self.parametros(trabajo)),
+                esperar=esperar
+            )
+    
+    def pipeline_lotes(self) -> Dict[str, Dict[str, Any]]: 
+        validacion = self.configs.validar()
+        resultados = {archivo: {'archivo': archivo, 'estado': 'invalido', 'error': error} for archivo, error in validacion['errores'].items()}
+        
+        if validacion['trabajos']: 
+            if self.ejecutor == 'procesos': 
+                resultados.update(self.pipeline_procesos(trabajos=validacion['trabajos']))
+            else: 
+                resultados.update(self.pipeline_prefect(trabajos=validacion['trabajos']))
+        
+        completados = sum(1 for resultado in resultados.values() if resultado['estado'] == 'completado')
+        logger.info(f'Lote terminado: {completados} de {len(resultados)} configs limpiados correctamente')
+        return resultados
+
+if __name__ == '__main__': 
+    #Uso: python BatchCleaning.py configs/ otro_config.yaml --columnas platform --workers 4 --memoria-mb 8000
+    parser = argparse.ArgumentParser(description='Limpieza por lotes de varios configs yaml/toml')
+    parser.add_argument('configs', nargs='+', help='Archivos o directorios con configs yaml/toml')
+    parser.add_argument('--columnas', nargs='+', required=True, help='Columnas representativas para imputar nulos')
+    parser.add_argument('--umbral', type=float, default=0.4)
+    parser.add_argument('--min-proportion', type=int, default=45)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--memoria-mb', type=int, default=None)
+    parser.add_argument('--ejecutor', choices=['procesos', 'prefect'], default='procesos')
+    args = parser.parse_args()
+    
+    resultados = BatchCleaning(
+        configs=args.configs,
+        columnas_representativas=args.columnas,
+        umbral=args.umbral,
+        min_proportion=args.min_proportion,
+        max_workers=args.workers,
+        memoria_maxima_mb=args.memoria_mb,
+        ejecutor=args.ejecutor
+    ).pipeline_lotes()
+    raise SystemExit(0 if all(resultado['estado'] == 'completado' for resultado in resultados.values()) else 1)
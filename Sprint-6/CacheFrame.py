@@ -0,0 +1,131 @@
+#Importamos las librerías necesarias
+import polars as pl
+import hashlib
+import logging
+from pathlib import Path
+from pydantic import BaseModel
+from typing import List, Tuple, Union
+from SchemaFrame import SchemaOverride
+from SourceFrame import InputSource
+
+#Config del logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s-%(levelname)s-%(message)s')
+logger = logging.getLogger(__name__)
+
+class ParquetCache: 
+    def __init__(self, model: BaseModel):
+        self.archivo = Path(model.Paths.input_file)
+        self.cache_dir = model.Paths.cache_dir
+        
+        null_values = model.Cleaning_Rules.null_values
+        self.null_data_handler = null_values.null_val_csv if null_values is not None else None
+        self.schema_overrides = SchemaOverride(model=model).schema_original()
+    
+    def clave_fuente(self) -> str: 
+        return hashlib.sha256(str(self.archivo.resolve()).encode('utf-8')).hexdigest()[:8]
+    
+    def clave_cache(self) -> str: 
+        stat = self.archivo.stat()
+        null_val = sorted(self.null_data_handler) if self.null_data_handler is not None else []
+        schema = sorted((col, str(dtype)) for col, dtype in self.schema_overrides.items())
+        clave = f'{self.archivo.resolve()}|{stat.st_size}|{stat.st_mtime_ns}|{null_val}|{schema}'
+        return hashlib.sha256(clave.encode('utf-8')).hexdigest()[:16]
+    
+    def ruta_cache(self) -> Path: 
+        #El prefijo identifica el archivo de origen para poder borrar sus conversiones viejas
+        return Path(self.cache_dir) / f'{self.archivo.stem}-{self.clave_fuente()}-{self.clave_cache()}.parquet'
+    
+    def habilitada(self) -> bool: 
+        return self.cache_dir is not None and self.archivo.is_file() and self.archivo.suffix == '.csv'
+    
+    def convertir_csv(self, ruta: Path) -> None: 
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        ruta_temporal = ruta.with_suffix('.parquet.tmp')
+        
+        pl.scan_csv(
+            self.archivo, 
+            null_values=self.null_data_handler, 
+            schema_overrides=self.schema_overrides
+        ).sink_parquet(ruta_temporal, engine='streaming')
+        ruta_temporal.replace(ruta)
+        logger.info(f'Se convirtió el archivo {self.archivo.name} a parquet en la cache: {ruta.name}')
+    
+    def eliminar_viejas(self, ruta: Path) -> None: 
+        #Un cambio de tamaño, mtime, nulos o tipos deja obsoletas las conversiones anteriores del mismo archivo
+        for vieja in ruta.parent.glob(f'{self.archivo.stem}-{self.clave_fuente()}-*.parquet'): 
+            if vieja != ruta: 
+                vieja.unlink(missing_ok=True)
+                logger.info(f'Se eliminó la conversión obsoleta {vieja.name} de la cache')
+    
+    def ruta_frame(self) -> Path: 
+        #Solo lectura: la copia parquet si ya existe, si no el csv original (la validación no convierte)
+        if not self.habilitada(): 
+            return self.archivo
+        
+        ruta = self.ruta_cache()
+        return ruta if ruta.exists() else self.archivo
+    
+    def convertir_frame(self) -> Path: 
+        if not self.habilitada(): 
+            return self.archivo
+        
+        ruta = self.ruta_cache()
+        if not ruta.exists(): 
+            self.convertir_csv(ruta=ruta)
+            self.eliminar_viejas(ruta=ruta)
+        return ruta
+
+class StageCheckpoint: 
+    def __init__(self, model: BaseModel):
+        checkpoint = model.Checkpoint_Params
+        self.habilitado = checkpoint.enabled
+        self.directorio = Path(checkpoint.checkpoint_dir)
+        self.formato = checkpoint.formato.value
+        self.etapas = checkpoint.stages
+        self.huella = self.huella_entrada(model=model) if self.habilitado else None
+    
+    def huella_entrada(self, model: BaseModel) -> str: 
+        #La huella combina los archivos de entrada (ruta, tamaño, mtime) con el config validado
+        return InputSource(model.Paths.input_file).huella_hash(contexto=model.model_dump_json(warnings=False))
+    
+    def activo(self, etapa: str) -> bool: 
+        return self.habilitado and etapa in self.etapas
+    
+    def ruta_checkpoint(self, etapa: str, parametros: str='') -> Path: 
+        clave = hashlib.sha256(f'{self.huella}|{etapa}|{parametros}'.encode('utf-8')).hexdigest()[:16]
+        extension = 'arrow' if self.formato == 'ipc' else 'parquet'
+        return self.directorio / f'{etapa}-{clave}.{extension}'
+    
+    def existe(self, etapa: str, parametros: str='') -> bool: 
+        return self.activo(etapa) and self.ruta_checkpoint(etapa=etapa, parametros=parametros).exists()
+    
+    def ultima_etapa(self, etapas: List[Tuple[str, str]]) -> int: 
+        for posicion in range(len(etapas) - 1, -1, -1): 
+            etapa, parametros = etapas[posicion]
+            if self.existe(etapa=etapa, parametros=parametros): 
+                return posicion
+        return -1
+    
+    def leer(self, etapa: str, parametros: str='', lazy: bool=True) -> Union[pl.DataFrame, pl.LazyFrame]: 
+        ruta = self.ruta_checkpoint(etapa=etapa, parametros=parametros)
+        if self.formato == 'ipc': 
+            frame = pl.scan_ipc(ruta)
+        else: 
+            frame = pl.scan_parquet(ruta)
+        return frame if lazy else frame.collect()
+    
+    def guardar(self, frame: Union[pl.DataFrame, pl.LazyFrame], etapa: str, parametros: str='') -> Union[pl.DataFrame, pl.LazyFrame]: 
+        ruta = self.ruta_checkpoint(etapa=etapa, parametros=parametros)
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        ruta_temporal = ruta.with_suffix(ruta.suffix + '.tmp')
+        
+        if self.formato == 'ipc': 
+            frame.lazy().sink_ipc(ruta_temporal, engine='streaming')
+        else: 
+            frame.lazy().sink_parquet(ruta_temporal, engine='streaming')
+        ruta_temporal.replace(ruta)
+        
+        #Un Frame lazy continúa desde el checkpoint para no recalcular el plan en las siguientes etapas
+        if isinstance(frame, pl.LazyFrame): 
+            return self.leer(etapa=etapa, parametros=parametros)
+        return frame
@@ -0,0 +1,70 @@
+#Importamos las librerías necesarias
+import polars as pl
+from pydantic import BaseModel
+from typing import Any, Dict, List, Tuple, Union
+from SourceFrame import InputSource
+
+class DataCheck: 
+    def __init__(self, model: BaseModel):
+        self.rename_col = model.Cleaning_Rules.column_rename or {}
+        null_values = model.Cleaning_Rules.null_values
+        self.null_data_handler = null_values.null_val_csv if null_values is not None else None
+        self.categorias = self.categorias_config(model=model)
+        self.metricas = list(dict.fromkeys([model.Hypotesis_Testing.test_1.metric, model.Hypotesis_Testing.test_2.metric]))
+    
+    def categorias_config(self, model: BaseModel) -> List[Tuple[str, str, str]]: 
+        #(columna renombrada, categoría, mensaje de error), la plataforma popular se busca en la columna de grupos del análisis
+        pop_platform = model.Analysis_Params.popular_platform_corr
+        categorias = [(model.Hypotesis_Testing.test_1.group_column, pop_platform, f'La categoría {pop_platform} no existe en el Frame')]
+        
+        for test in [model.Hypotesis_Testing.test_1, model.Hypotesis_Testing.test_2]: 
+            for cat in test.groups: 
+                categorias.append((test.group_column, cat, f'La categoria {cat} no existe en el Frame'))
+        return categorias
+    
+    def nombre(self, col: str, renombrado: bool=False) -> str: 
+        #Las columnas del config usan el nombre renombrado, el scan de la entrada necesita el original
+        if renombrado: 
+            return col
+        nombre_original = {nuevo: original for original, nuevo in self.rename_col.items()}
+        return nombre_original.get(col, col)
+    
+    def columnas(self, renombrado: bool=False) -> Dict[str, List[str]]: 
+        columnas = {}
+        for col, cat, _ in self.categorias: 
+            columna = self.nombre(col=col, renombrado=renombrado)
+            columnas.setdefault(columna, [])
+            if cat not in columnas[columna]: 
+                columnas[columna].append(cat)
+        return columnas
+    
+    def expr_checks(self, renombrado: bool=False) -> List[pl.Expr]: 
+        #Por columna se guardan solo las categorías pedidas que aparecen y por métrica los valores no nulos
+        list_expr = []
+        for posicion, (col, categorias) in enumerate(self.columnas(renombrado=renombrado).items()): 
+            valores = pl.col(col).cast(pl.Utf8)
+            list_expr.append(valores.filter(valores.is_in(categorias)).unique().implode().alias(f'categorias_{posicion}'))
+        for posicion, metrica in enumerate(self.metricas): 
+            list_expr.append(pl.col(self.nombre(col=metrica, renombrado=renombrado)).count().alias(f'metrica_{posicion}'))
+        return list_expr
+    
+    def validar(self, resultado: Dict[str, Any], renombrado: bool=False) -> None: 
+        encontradas = {}
+        for posicion, col in enumerate(self.columnas(renombrado=renombrado)): 
+            encontradas[col] = set(resultado[f'categorias_{posicion}'])
+        
+        for col, cat, mensaje in self.categorias: 
+            if cat not in encontradas[self.nombre(col=col, renombrado=renombrado)]: 
+                raise ValueError(mensaje)
+        
+        for posicion, metrica in enumerate(self.metricas): 
+            if resultado[f'metrica_{posicion}'] == 0: 
+                raise ValueError(f'La metrica {metrica} no tiene valores en el Frame')
+    
+    def revisar(self, frame: Union[pl.DataFrame, pl.LazyFrame], renombrado: bool=False) -> None: 
+        resultado = frame.lazy().select(self.expr_checks(renombrado=renombrado)).collect(engine='streaming').row(0, named=True)
+        self.validar(resultado=resultado, renombrado=renombrado)
+    
+    def revisar_archivo(self, archivo: InputSource) -> None: 
+        #Un solo select revisa todas las categorías y métricas en el archivo completo, sin renombrar ni filtrar
+        self.revisar(frame=archivo.scan(null_values=self.null_data_handler))
@@ -1,14 +1,38 @@
 #Importamos las librerías para el proyecto 
 import polars as pl
+import json
 import logging
+from pathlib import Path
 from pydantic import BaseModel
-from typing import Union, List, Tuple
-from prefect import task, flow
+from typing import Union, List, Tuple, Optional, Dict
+from LazyPrefect import task, flow, get_run_logger
+from GetFrame import RowFilter, FrameCollector
+from SchemaFrame import SchemaOverride
+from SourceFrame import InputSource
+from CacheFrame import StageCheckpoint
+from CheckFrame import DataCheck
 
 #Configuracion del logging 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s-(levelname)s-%(message)s')
 logger = logging.getLogger(__name__)
 
+class FrameUtils: 
+    @staticmethod
+    def altura(frame: Union[pl.DataFrame, pl.LazyFrame]) -> int: 
+        if isinstance(frame, pl.LazyFrame): 
+            return frame.select(pl.len()).collect(engine='streaming').item()
+        return frame.height
+    
+    @staticmethod
+    def columnas(frame: Union[pl.DataFrame, pl.LazyFrame]) -> List[str]: 
+        return frame.collect_schema().names()
+    
+    @staticmethod
+    def materializar(frame: Union[pl.DataFrame, pl.LazyFrame]) -> pl.DataFrame: 
+        if isinstance(frame, pl.LazyFrame): 
+            return frame.collect(engine='streaming')
+        return frame
+
 class RenameColumn: 
     def __init__(self, frame: Union[pl.DataFrame, pl.LazyFrame], model: BaseModel):
         self.frame = frame
@@ -17,6 +41,16 @@ class RenameColumn:
     def rename_columns(self) -> Union[pl.DataFrame, pl.LazyFrame]: 
         return self.frame.rename(self.rename_col)
 
+class FilterRows: 
+    def __init__(self, frame: Union[pl.DataFrame, pl.LazyFrame], model: BaseModel):
+        self.frame = frame
+        self.filtro = RowFilter(model=model).filtro_frame()
+    
+    def filter_rows(self) -> Union[pl.DataFrame, pl.LazyFrame]: 
+        if self.filtro is None: 
+            return self.frame
+        return self.frame.filter(self.filtro)
+
 class TypeDtype:
     @staticmethod
     def int_dtype(col_int: str) -> pl.Expr: 
@@ -30,16 +64,50 @@ class TypeDtype:
     def str_dtype(col_str: str) -> pl.Expr: 
         return pl.col(col_str).cast(pl.Utf8)
 
+class FeatureEngineer: 
+    nombres = {
+        'sum': 'total_sales',
+        'mean': 'mean_sales',
+        'min': 'min_sales',
+        'max': 'max_sales'
+    }
+    
+    def __init__(self, model: BaseModel):
+        feature = model.Feature_Engineer
+        self.columnas = feature.sales_column or []
+        self.operacion = feature.operation.value if feature.operation is not None else None
+        self.nombre = feature.output_column or self.nombres.get(self.operacion)
+    
+    def expr_feature(self, columnas_frame: List[str], expr_columnas: Dict[str, pl.Expr]) -> List[pl.Expr]: 
+        if not self.columnas or self.operacion is None: 
+            return []
+        
+        columnas = [col for col in self.columnas if col in columnas_frame]
+        faltantes = [col for col in self.columnas if col not in columnas_frame]
+        if faltantes: 
+            logger.warning(f'Las columnas {faltantes} se eliminaron en la limpieza, {self.nombre} se calcula sin ellas')
+        if not columnas: 
+            return []
+        
+        #Se usa la columna ya casteada para que la agregación horizontal vea el mismo tipo que la salida
+        list_expr = [expr_columnas.get(col, pl.col(col)) for col in columnas]
+        return [getattr(pl, f'{self.operacion}_horizontal')(list_expr).alias(self.nombre)]
+
 class DtypeOverride: 
     def __init__(self, frame: Union[pl.DataFrame, pl.LazyFrame], model: BaseModel):
         self.frame = frame
         self.dtype_dict = model.Cleaning_Rules.dtype_override
         self.dtype = TypeDtype()
+        self.feature = FeatureEngineer(model=model)
     
     def type_dtype(self): 
         list_dtype_expr = []
+        schema = self.frame.collect_schema()
         
         for col, dtype in self.dtype_dict.items(): 
+            #Las columnas que ya se tiparon en la lectura no se vuelven a castear, las eliminadas por nulos se omiten
+            if col not in schema or schema.get(col) == SchemaOverride.tipos_polars[dtype]: 
+                continue
             if dtype == 'Int32': 
                 list_dtype_expr.append(self.dtype.int_dtype(col_int=col))
             elif dtype == 'Float32': 
@@ -51,6 +119,10 @@ class DtypeOverride:
     
     def dtype_override(self) -> Union[pl.DataFrame, pl.LazyFrame]: 
         list_expr = self.type_dtype()
+        
+        #La columna de Feature_Engineer va en el mismo with_columns que los casteos, sin otra pasada sobre el frame
+        expr_columnas = {expr.meta.output_name(): expr for expr in list_expr}
+        list_expr = list_expr + self.feature.expr_feature(columnas_frame=FrameUtils.columnas(self.frame), expr_columnas=expr_columnas)
         return self.frame.with_columns(list_expr)
 
 class CatNullHandler: 
@@ -61,7 +133,8 @@ class CatNullHandler:
         return pl.col(cat_col).fill_null(self.null_cat)
     
     def input_mode(self, cat_col: str) -> pl.Expr: 
-        return pl.col(cat_col).mode().first()
+        #La moda del grupo llega unida al frame desde ModeTable, solo se rellenan las posiciones nulas
+        return pl.col(cat_col).fill_null(pl.col(ModeTable.columna_valor(cat_col)))
     
     def input_cat_col(self, cat_col: str) -> pl.Expr: 
         if self.null_cat == 'mode': 
@@ -79,15 +152,66 @@ class NumNullHandler:
     def input_num_data(self, col_num: str) -> pl.Expr: 
         return pl.col(col_num).fill_null(self.operation_fill(col_num=col_num))
 
+class ModeTable: 
+    def __init__(self, 
+        frame: Union[pl.DataFrame, pl.LazyFrame], 
+        columnas_representativas: Union[List[str], str], 
+        columnas_cat: List[str]):
+        
+        self.frame = frame
+        self.col_rep = [columnas_representativas] if isinstance(columnas_representativas, str) else list(columnas_representativas)
+        self.col_cat = columnas_cat
+    
+    @staticmethod
+    def columna_valor(col: str) -> str: 
+        return f'valor_{col}'
+    
+    @staticmethod
+    def columna_conteo(col: str) -> str: 
+        return f'__valor_{col}'
+    
+    def tabla_conteos(self) -> Union[pl.DataFrame, pl.LazyFrame]: 
+        #Formato largo (grupo, columna, valor): un solo group_by cuenta los valores de todas las categóricas
+        #Los valores van con alias propio porque una columna representativa también puede ser objetivo
+        columnas = [self.columna_conteo(col) for col in self.col_cat]
+        return (
+            self.frame
+            .select(self.col_rep + [pl.col(col).cast(pl.Utf8).alias(self.columna_conteo(col)) for col in self.col_cat])
+            .unpivot(on=columnas, index=self.col_rep, variable_name='columna', value_name='valor')
+            .drop_nulls('valor')
+            .group_by(self.col_rep + ['columna', 'valor'])
+            .agg(pl.len().alias('conteo'))
+        )
+    
+    def tabla_moda(self) -> Union[pl.DataFrame, pl.LazyFrame]: 
+        #En un empate gana el valor menor para que el resultado no dependa del orden de los datos
+        schema = self.frame.collect_schema()
+        moda = (
+            self.tabla_conteos()
+            .group_by(self.col_rep + ['columna'])
+            .agg(pl.col('valor').sort_by(['conteo', 'valor'], descending=[True, False]).first())
+        )
+        tabla = (
+            moda.lazy()
+            .pivot(on='columna', on_columns=[self.columna_conteo(col) for col in self.col_cat], index=self.col_rep, values='valor')
+            .select(self.col_rep + [pl.col(self.columna_conteo(col)).cast(schema[col]).alias(self.columna_valor(col)) for col in self.col_cat])
+        )
+        return tabla.collect() if isinstance(self.frame, pl.DataFrame) else tabla
+
 class InputData: 
     def __init__(self, frame: Union[pl.LazyFrame, pl.DataFrame], model: BaseModel):
         self.frame = frame
         
-        self.num_frame = self.frame.select(pl.selectors.numeric()).columns
+        self.num_frame = FrameUtils.columnas(self.frame.select(pl.selectors.numeric()))
         
         self.input_cat = CatNullHandler(model=model)
         self.input_num = NumNullHandler(model=model)
     
+    def columnas_moda(self, columnas: List[str]) -> List[str]: 
+        if self.input_cat.null_cat != 'mode': 
+            return []
+        return [col for col in columnas if col not in self.num_frame]
+    
     def input_data_op(self, col: str) -> pl.Expr: 
         if col in self.num_frame: 
             operacion = self.input_num.input_num_data(col_num=col)
@@ -95,6 +219,18 @@ class InputData:
             operacion = self.input_cat.input_cat_col(cat_col=col)
         
         return operacion
+    
+    def input_data_stat(self, col: str) -> Optional[pl.Expr]: 
+        #Estadística numérica por grupo para la estrategia join, las modas salen de ModeTable
+        if col in self.num_frame: 
+            return self.input_num.operation_fill(col_num=col)
+        return None
+    
+    def input_data_join(self, col: str) -> pl.Expr: 
+        #Mismo resultado que input_data_op sobre la ventana, leyendo la estadística ya unida al frame
+        if col in self.num_frame: 
+            return pl.col(col).fill_null(pl.col(ModeTable.columna_valor(col)))
+        return self.input_cat.input_cat_col(cat_col=col)
 
 class DeleteData: 
     def __init__(self, frame: Union[pl.LazyFrame, pl.DataFrame]):
@@ -103,51 +239,118 @@ class DeleteData:
     def delete_column(self, list_col: List[str]) -> pl.Expr: 
         return self.frame.drop(list_col)
     
-    def delete_row(self, frame_sucio: Union[pl.DataFrame, pl.LazyFrame]) -> pl.Expr: 
-        columna = frame_sucio.get_column('index').to_list()
-        return ~pl.col('index').is_in(columna)
+    def delete_row(self, columnas: List[str], umbral_filas: float) -> pl.Expr: 
+        #Mascara fusionada: se elimina la fila si supera el umbral de nulos y tiene nulo en alguna columna marcada
+        columnas_nulas = pl.any_horizontal([pl.col(col).is_null() for col in columnas])
+        return ~(columnas_nulas & (NullProfile.expr_suma_nulos() > umbral_filas))
+
+class NullProfile: 
+    def __init__(self, 
+        frame: Union[pl.DataFrame, pl.LazyFrame], 
+        filtro: Optional[pl.Expr]=None, 
+        checks: Optional[DataCheck]=None):
+        self.frame = frame
+        self.filtro = filtro
+        self.checks = checks
+    
+    @classmethod
+    def perfil_validacion(cls, frame: Union[pl.DataFrame, pl.LazyFrame], model: BaseModel) -> Optional['NullProfile']: 
+        #Con validación diferida el perfil corre sobre el frame renombrado sin filtrar, los checks ven la entrada completa
+        #y el filtro de años se aplica dentro de cada agregado del perfil
+        if not model.Validation_Params.deferred: 
+            return None
+        return cls(frame=frame, filtro=RowFilter(model=model).filtro_frame(), checks=DataCheck(model=model))
+    
+    @staticmethod
+    def expr_suma_nulos() -> pl.Expr: 
+        return pl.sum_horizontal(pl.all().is_null().cast(pl.Int32))
+    
+    @staticmethod
+    def expr_numero_grupos(columnas_representativas: Union[List[str], str]) -> pl.Expr: 
+        #Estimación aproximada (HyperLogLog sobre el hash de la llave) de los grupos representativos
+        return pl.struct(columnas_representativas).hash().approx_n_unique()
+    
+    def perfil_nulos(self, 
+        umbral_filas_nulas: float=0.4, 
+        columnas_representativas: Optional[Union[List[str], str]]=None) -> Tuple[int, Dict[str, int], Dict[str, int], Optional[int]]: 
+        
+        columnas = FrameUtils.columnas(self.frame)
+        umbral_filas = len(columnas)*umbral_filas_nulas
+        filas_nulas = self.expr_suma_nulos() > umbral_filas
+        
+        #Un solo select calcula los nulos por columna, los nulos de las filas sucias y los grupos representativos
+        if self.filtro is None: 
+            list_expr = [pl.len().alias('total_filas')]
+            for posicion, col in enumerate(columnas): 
+                list_expr.append(pl.col(col).null_count().alias(f'nulos_{posicion}'))
+                list_expr.append((pl.col(col).is_null() & filas_nulas).sum().alias(f'filas_nulas_{posicion}'))
+            if columnas_representativas: 
+                list_expr.append(self.expr_numero_grupos(columnas_representativas).alias('numero_grupos'))
+        else: 
+            #Sobre el frame sin filtrar cada agregado solo cuenta las filas que pasan el filtro, una máscara nula cuenta como falsa
+            list_expr = [self.filtro.sum().alias('total_filas')]
+            for posicion, col in enumerate(columnas): 
+                list_expr.append((pl.col(col).is_null() & self.filtro).sum().alias(f'nulos_{posicion}'))
+                list_expr.append((pl.col(col).is_null() & filas_nulas & self.filtro).sum().alias(f'filas_nulas_{posicion}'))
+            if columnas_representativas: 
+                list_expr.append(pl.struct(columnas_representativas).filter(self.filtro).hash().approx_n_unique().alias('numero_grupos'))
+        
+        #Los checks de la validación diferida van en el mismo select y se revisan antes de tomar cualquier decisión
+        if self.checks is not None: 
+            list_expr += self.checks.expr_checks(renombrado=True)
+        
+        perfil = FrameUtils.materializar(self.frame.lazy().select(list_expr)).row(0, named=True)
+        if self.checks is not None: 
+            self.checks.validar(resultado=perfil, renombrado=True)
+        
+        nulos_columna = {col: perfil[f'nulos_{posicion}'] for posicion, col in enumerate(columnas)}
+        filas_nulas_columna = {col: perfil[f'filas_nulas_{posicion}'] for posicion, col in enumerate(columnas)}
+        return perfil['total_filas'], nulos_columna, filas_nulas_columna, perfil.get('numero_grupos')
 
 class TupleExprNullHanlder: 
-    def __init__(self, frame: Union[pl.DataFrame, pl.LazyFrame], model: BaseModel):
+    def __init__(self, frame: Union[pl.DataFrame, pl.LazyFrame], model: BaseModel, perfil: Optional[NullProfile]=None):
         self.frame = frame
         self.model = model
+        self.perfil = perfil if perfil is not None else NullProfile(frame=self.frame)
         
         self.delete_data = DeleteData(frame=self.frame)
+        self.columnas_filas = []
+        self.numero_grupos = None
     
-    def row_handler_null(self, filtro_null: Union[pl.DataFrame, pl.LazyFrame], umbral_filas_nulas: float=0.4) -> pl.Expr: 
-        umbral_filas = (self.frame.width*umbral_filas_nulas)
-        
-        filtro_filas_nulas = filtro_null.with_columns(
-        suma_nulos=pl.sum_horizontal(pl.col('*').is_null().cast(pl.Int32))
-            ).filter(pl.col('suma_nulos') > umbral_filas)
-        
-        porcentaje_nulos_fila = (filtro_filas_nulas.height/filtro_null.height)*100
-        
-        if porcentaje_nulos_fila >= 40: 
-            return self.delete_data.delete_row(frame_sucio=filtro_filas_nulas)
+    def row_handler_null(self, nulos_columna: int, filas_nulas_columna: int) -> bool: 
+        porcentaje_nulos_fila = (filas_nulas_columna/nulos_columna)*100
+        return porcentaje_nulos_fila >= 40
     
-    def col_handler(self, umbral_filas: float=0.4) -> Tuple[List[pl.Expr]]: 
-        tamaño_frame = self.frame.height
-        frame_index = self.frame.with_row_index()
+    def col_handler(self, umbral_filas: float=0.4, columnas_representativas: Optional[Union[List[str], str]]=None) -> Tuple[List[pl.Expr]]: 
+        tamaño_frame, nulos_por_columna, filas_nulas_por_columna, self.numero_grupos = self.perfil.perfil_nulos(
+            umbral_filas_nulas=umbral_filas, 
+            columnas_representativas=columnas_representativas
+        )
         
         null_row_col_handler = []
         columnas_a_eliminar = []
         columnas_a_analizar = []
         
-        for col in self.frame.columns: 
-            filtro_nulos = frame_index.filter(pl.col(col).is_null())
-            if filtro_nulos.height > 0: 
-                porcentaje_nulos_columna = (filtro_nulos.height/tamaño_frame)*100
+        for col, nulos_columna in nulos_por_columna.items(): 
+            if nulos_columna > 0: 
+                porcentaje_nulos_columna = (nulos_columna/tamaño_frame)*100
                 
                 if porcentaje_nulos_columna < 65: 
-                    nulos = self.row_handler_null(filtro_null=filtro_nulos, umbral_filas_nulas=umbral_filas)
-                    if nulos is None: 
-                        columnas_a_analizar.append(col)
+                    filas_nulas = self.row_handler_null(
+                        nulos_columna=nulos_columna, 
+                        filas_nulas_columna=filas_nulas_por_columna[col]
+                    )
+                    if filas_nulas: 
+                        self.columnas_filas.append(col)
                     else: 
-                        null_row_col_handler.append(nulos)
+                        columnas_a_analizar.append(col)
                 else: 
                     columnas_a_eliminar.append(col)
         
+        if self.columnas_filas: 
+            umbral = len(nulos_por_columna)*umbral_filas
+            null_row_col_handler.append(self.delete_data.delete_row(columnas=self.columnas_filas, umbral_filas=umbral))
+        
         return null_row_col_handler, columnas_a_eliminar, columnas_a_analizar
 
 class AnalysisNullData: 
@@ -155,70 +358,157 @@ class AnalysisNullData:
         frame: Union[pl.DataFrame, pl.LazyFrame], 
         model: BaseModel,
         columnas_representativas: List[str], 
-        columnas_target: List[str]):
+        columnas_target: List[str], 
+        numero_grupos: Optional[int]=None, 
+        modo: Optional[str]=None):
         
         self.frame = frame
         self.col_rep = columnas_representativas
         self.col_target = columnas_target
+        self.max_grupos = model.Cleaning_Rules.null_values.max_window_groups
+        self.grupos = numero_grupos
+        self.modo = modo
         
         self.input = InputData(frame=self.frame, model=model)
     
-    def expr_non_null_count(self) -> List[pl.Expr]: 
-        lista_expr = []
+    def expr_porcentaje_no_nulos(self, col: str) -> pl.Expr: 
+        non_null_count = pl.col(col).drop_nulls().count().over(self.col_rep)
+        total = pl.len().over(self.col_rep)
+        return (non_null_count/total)*100
+    
+    def expr_relleno_ventana(self, col: str) -> pl.Expr: 
+        #Solo la estadística numérica necesita la ventana, la moda ya viene calculada por grupo
+        relleno = self.input.input_data_op(col=col)
+        if col in self.input.num_frame: 
+            return relleno.over(self.col_rep)
+        return relleno
+    
+    def expr_imputar(self, col: str, min_proportion: int=45) -> pl.Expr: 
+        return (
+            pl.when(self.expr_porcentaje_no_nulos(col=col) < min_proportion)
+            .then(pl.col(col))
+            .otherwise(self.expr_relleno_ventana(col=col))
+            .alias(col)
+        )
+    
+    def unir_frame(self, tabla: Union[pl.DataFrame, pl.LazyFrame]) -> Union[pl.DataFrame, pl.LazyFrame]: 
+        return self.frame.join(tabla, on=self.col_rep, how='left', maintain_order='left', nulls_equal=True)
+    
+    def analysis_null_window(self, min_proportion: int=45) -> Union[pl.DataFrame, pl.LazyFrame]: 
+        frame = self.frame
+        columnas_moda = self.input.columnas_moda(columnas=self.col_target)
+        if columnas_moda: 
+            frame = self.unir_frame(tabla=ModeTable(frame=self.frame, columnas_representativas=self.col_rep, columnas_cat=columnas_moda).tabla_moda())
         
+        #Un solo with_columns calcula los porcentajes y rellenos de todas las columnas sobre el frame original
+        frame = frame.with_columns(
+            [self.expr_imputar(col=col, min_proportion=min_proportion) for col in self.col_target]
+        )
+        return frame.drop([ModeTable.columna_valor(col) for col in columnas_moda])
+    
+    def estadisticas_grupo(self) -> Union[pl.DataFrame, pl.LazyFrame]: 
+        #Un solo group_by calcula el conteo, los no nulos y la estadística numérica de todas las columnas
+        list_expr = []
         for col in self.col_target: 
-            non_null_count = pl.col(col).drop_nulls().count().over(self.col_rep)
-            total = pl.len().over(self.col_rep)
-            porcentaje_no_nulos = ((non_null_count/total)*100).alias(f'porcentaje_no_nulos_{col}')
-            lista_expr.append(porcentaje_no_nulos)
+            list_expr.append(((pl.col(col).drop_nulls().count()/pl.len())*100).alias(f'porcentaje_no_nulos_{col}'))
+            estadistica = self.input.input_data_stat(col=col)
+            if estadistica is not None: 
+                list_expr.append(estadistica.alias(ModeTable.columna_valor(col)))
+        estadisticas = self.frame.group_by(self.col_rep).agg(list_expr)
         
-        return lista_expr
+        #Las modas de todas las categóricas comparten la misma llave y se unen a la tabla de grupos
+        columnas_moda = self.input.columnas_moda(columnas=self.col_target)
+        if columnas_moda: 
+            moda = ModeTable(frame=self.frame, columnas_representativas=self.col_rep, columnas_cat=columnas_moda).tabla_moda()
+            estadisticas = estadisticas.join(moda, on=self.col_rep, how='left', nulls_equal=True)
+        return estadisticas
     
-    def etiquetar_frame(self, col: str, min_proportion: int=45) -> Union[pl.DataFrame, pl.LazyFrame]: 
-        frame_porcentajes = self.frame.with_columns(
-            self.expr_non_null_count()
-            )
+    def analysis_null_join(self, min_proportion: int=45) -> Union[pl.DataFrame, pl.LazyFrame]: 
+        estadisticas = self.estadisticas_grupo()
+        columnas_estadisticas = [col for col in FrameUtils.columnas(estadisticas) if col not in self.col_rep]
         
-        frame_etiquetado = frame_porcentajes.with_columns(
+        frame = self.unir_frame(tabla=estadisticas)
+        list_expr = [
             pl.when(pl.col(f'porcentaje_no_nulos_{col}') < min_proportion)
-            .then(pl.lit('eliminar'))
-            .otherwise(pl.lit('imputar'))
-            .alias(f'estado_{col}')
-        )
-        
-        return frame_etiquetado
+            .then(pl.col(col))
+            .otherwise(self.input.input_data_join(col=col))
+            .alias(col)
+            for col in self.col_target
+        ]
+        return frame.with_columns(list_expr).drop(columnas_estadisticas)
     
-    def filtrado_frame_imput(self, col: str, min_proportion: int=45) -> Union[pl.DataFrame, pl.LazyFrame]: 
-        frame = self.etiquetar_frame(col=col, min_proportion=min_proportion)
-        
-        frame_imputado = frame.with_columns(
-            pl.when(pl.col(f'estado_{col}')=='imputar')
-            .then(self.input.input_data_op(col=col).over(self.col_rep))
-            .otherwise(pl.col(col))
-        ).drop(f'estado_{col}')
+    def numero_grupos(self) -> int: 
+        #Se reutiliza la estimación del perfil de nulos y solo sin ella se lanza un agregado propio
+        if self.grupos is not None: 
+            return self.grupos
+        return FrameUtils.materializar(
+            self.frame.lazy().select(NullProfile.expr_numero_grupos(self.col_rep))
+        ).item()
+    
+    def estrategia_grupo(self) -> str: 
+        #El motor streaming no ejecuta las ventanas .over fuera de memoria, en ese modo siempre se agrupa y se une
+        if self.modo == 'streaming': 
+            logger.info(f'Modo streaming: se usa la estrategia join para {self.col_rep}')
+            return 'join'
         
-        return frame_imputado
+        grupos = self.numero_grupos()
+        estrategia = 'join' if grupos > self.max_grupos else 'window'
+        logger.info(f'Se estimaron {grupos} grupos para {self.col_rep}, se usa la estrategia {estrategia}')
+        return estrategia
     
     def analysis_null_data(self, min_proportion: int=45) -> Union[pl.DataFrame, pl.LazyFrame]: 
-        for col in self.col_target: 
-            self.frame = self.filtrado_frame_imput(col=col, min_proportion=min_proportion)
-        
-        return self.frame.drop([f'porcentaje_no_nulos_{col}' for col in self.col_target])
+        #Con muchos grupos las ventanas .over se vuelven costosas y conviene agrupar una vez y unir el resultado
+        if self.estrategia_grupo() == 'join': 
+            return self.analysis_null_join(min_proportion=min_proportion)
+        return self.analysis_null_window(min_proportion=min_proportion)
 
 class NullHandler: 
     def __init__(self, 
         frame: Union[pl.DataFrame, pl.LazyFrame], 
         model: BaseModel, 
-        umbral: float=0.4):
+        umbral: float=0.4, 
+        columnas_representativas: Optional[Union[List[str], str]]=None, 
+        decisiones: Optional[Dict]=None, 
+        modo: Optional[str]=None, 
+        perfil: Optional[NullProfile]=None):
         self.frame = frame
         self.model = model
+        self.umbral = umbral
+        self.col_rep = columnas_representativas
+        self.modo = modo
         
-        self.null_row, self.delete_col, self.analyse_null = TupleExprNullHanlder(frame=self.frame, model=self.model).col_handler(umbral_filas=umbral)
+        if decisiones is not None: 
+            #Decisiones ya perfiladas (por ejemplo desde la cache del compilador), no se vuelve a escanear el frame
+            self.columnas_filas = decisiones['columnas_filas']
+            self.delete_col = decisiones['columnas_eliminadas']
+            self.analyse_null = decisiones['columnas_analizar']
+            self.numero_grupos = decisiones.get('numero_grupos')
+            self.null_row = []
+            if self.columnas_filas: 
+                umbral_filas = len(FrameUtils.columnas(self.frame))*umbral
+                self.null_row.append(DeleteData(frame=self.frame).delete_row(columnas=self.columnas_filas, umbral_filas=umbral_filas))
+        else: 
+            handler = TupleExprNullHanlder(frame=self.frame, model=self.model, perfil=perfil)
+            self.null_row, self.delete_col, self.analyse_null = handler.col_handler(
+                umbral_filas=umbral, 
+                columnas_representativas=columnas_representativas
+            )
+            self.columnas_filas = handler.columnas_filas
+            self.numero_grupos = handler.numero_grupos
+    
+    def decisiones(self) -> Dict: 
+        return {
+            'umbral': self.umbral,
+            'columnas_filas': self.columnas_filas,
+            'columnas_eliminadas': self.delete_col,
+            'columnas_analizar': self.analyse_null,
+            'numero_grupos': self.numero_grupos
+        }
     
     def delete_data_row(self, frame: Union[pl.LazyFrame, pl.DataFrame]) -> Union[pl.LazyFrame, pl.DataFrame]: 
         return frame.filter(
             self.null_row
-        ).drop('index')
+        )
     
     def analysis_data(self, 
         frame: Union[pl.LazyFrame, pl.DataFrame], 
@@ -229,15 +519,16 @@ class NullHandler:
             frame= frame, 
             model= self.model, 
             columnas_representativas= columnas_representativas, 
-            columnas_target=self.analyse_null)
+            columnas_target=self.analyse_null, 
+            numero_grupos=self.numero_grupos if columnas_representativas == self.col_rep else None, 
+            modo=self.modo)
         return frame_nuevo.analysis_null_data(min_proportion=min_proportion)
     
     def pipeline_null_handler(self, columnas_representativas: Union[List[str], str], min_proportion: int=45) -> Union[pl.LazyFrame, pl.DataFrame]: 
         frame = self.frame
         
         if self.null_row: 
-            frame_con_indice = frame.with_row_index()
-            frame = self.delete_data_row(frame=frame_con_indice)
+            frame = self.delete_data_row(frame=frame)
         if self.analyse_null: 
             frame = self.analysis_data(
                 frame=frame, 
@@ -251,16 +542,205 @@ class NullHandler:
         tipo_frame = DtypeOverride(frame=frame, model=self.model).dtype_override()
         return tipo_frame
 
+class SaveFrame: 
+    def __init__(self, model: BaseModel, archivo: Optional[Path]=None):
+        self.archivo = Path(archivo) if archivo is not None else Path(model.Paths.output_file)
+        self.salida = model.Output_Params
+    
+    def destino_parquet(self) -> Union[Path, pl.PartitionBy]: 
+        if self.salida.partition_by: 
+            return pl.PartitionBy(self.archivo, key=self.salida.partition_by)
+        return self.archivo
+    
+    def sink_frame(self, frame: pl.LazyFrame) -> None: 
+        if self.archivo.suffix == '.csv': 
+            frame.sink_csv(self.archivo, engine='streaming')
+        else: 
+            frame.sink_parquet(
+                self.destino_parquet(), 
+                compression=self.salida.compression.value, 
+                compression_level=self.salida.compression_level, 
+                row_group_size=self.salida.row_group_size, 
+                statistics=self.salida.statistics, 
+                mkdir=True, 
+                engine='streaming'
+            )
+    
+    def leer_salida(self) -> pl.LazyFrame: 
+        if self.archivo.suffix == '.csv': 
+            return pl.scan_csv(self.archivo)
+        return pl.scan_parquet(self.archivo, hive_partitioning=True if self.salida.partition_by else None)
+    
+    def guardar_frame(self, frame: Union[pl.DataFrame, pl.LazyFrame]) -> Union[pl.DataFrame, pl.LazyFrame]: 
+        self.sink_frame(frame=frame.lazy())
+        logger.info(f'Se guardó el Frame limpio en el archivo {self.archivo.name}')
+        
+        #Un Frame lazy se devuelve como scan de la salida para no materializarlo
+        if isinstance(frame, pl.LazyFrame): 
+            return self.leer_salida()
+        return frame
+
+class PlanCompiler: 
+    def __init__(self, model: BaseModel, reutilizar_decisiones: bool=True, modo: Optional[str]=None):
+        self.model = model
+        self.cache_dir = Path(model.Paths.cache_dir) if model.Paths.cache_dir is not None else None
+        self.reutilizar_decisiones = reutilizar_decisiones
+        self.modo = modo
+        
+        #Planes compilados por este compilador, la llave combina config, entrada, frame y parámetros
+        #Entre corridas solo persisten las decisiones de nulos en cache_dir, el LazyFrame se vuelve a armar sin perfilar
+        self.planes: Dict[str, pl.LazyFrame] = {}
+    
+    @staticmethod
+    def identidad_frame(frame: Union[pl.DataFrame, pl.LazyFrame]) -> str: 
+        #El plan sin optimizar identifica el scan, la proyección y los filtros o muestreos aplicados antes de limpiar
+        if isinstance(frame, pl.LazyFrame): 
+            return frame.explain(optimized=False)
+        return f'DataFrame{frame.shape}'
+    
+    def clave_plan(self, 
+        frame: Union[pl.DataFrame, pl.LazyFrame], 
+        columnas_representativas: Union[List[str], str], 
+        umbral: float=0.4, 
+        min_proportion: int=45) -> str: 
+        
+        #Las decisiones de nulos dependen de los datos, por eso la entrada y el frame que se limpia forman parte de la llave
+        schema = [(col, str(dtype)) for col, dtype in frame.collect_schema().items()]
+        contexto = f'{self.model.model_dump_json(warnings=False)}|{self.identidad_frame(frame)}|{schema}|{columnas_representativas}|{umbral}|{min_proportion}|{self.modo}'
+        return InputSource(self.model.Paths.input_file).huella_hash(contexto=contexto)[:16]
+    
+    def ruta_decisiones(self, clave: str) -> Optional[Path]: 
+        #Un frame que no viene de FrameCollector no corresponde necesariamente a la entrada completa del config
+        if self.cache_dir is None or not self.reutilizar_decisiones: 
+            return None
+        return self.cache_dir / f'plan-{clave}.json'
+    
+    def leer_decisiones(self, clave: str) -> Optional[Dict]: 
+        ruta = self.ruta_decisiones(clave=clave)
+        if ruta is None or not ruta.exists(): 
+            return None
+        with open(ruta, 'r') as f: 
+            return json.load(f)
+    
+    def guardar_decisiones(self, clave: str, decisiones: Dict) -> None: 
+        ruta = self.ruta_decisiones(clave=clave)
+        if ruta is None: 
+            return
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        ruta_temporal = ruta.with_suffix('.json.tmp')
+        with open(ruta_temporal, 'w') as f: 
+            json.dump(decisiones, f, indent=2)
+        ruta_temporal.replace(ruta)
+    
+    def compilar_nulos(self, 
+        frame: Union[pl.DataFrame, pl.LazyFrame], 
+        clave: str, 
+        columnas_representativas: Union[List[str], str], 
+        umbral: float=0.4, 
+        min_proportion: int=45, 
+        perfil: Optional[NullProfile]=None) -> Union[pl.DataFrame, pl.LazyFrame]: 
+        
+        #Las decisiones guardadas solo existen si el perfil (con los checks diferidos) ya pasó para esta entrada y config
+        decisiones = self.leer_decisiones(clave=clave)
+        if decisiones is not None: 
+            logger.info(f'Se reutilizan las decisiones de nulos del plan {clave}, no se perfila el frame')
+        
+        null_data = NullHandler(
+            frame=frame, 
+            model=self.model, 
+            umbral=umbral, 
+            columnas_representativas=columnas_representativas, 
+            decisiones=decisiones, 
+            modo=self.modo, 
+            perfil=perfil
+        )
+        if decisiones is None: 
+            self.guardar_decisiones(clave=clave, decisiones=null_data.decisiones())
+        
+        return null_data.pipeline_null_handler(columnas_representativas=columnas_representativas, min_proportion=min_proportion)
+    
+    def compilar(self, 
+        frame: Union[pl.DataFrame, pl.LazyFrame], 
+        columnas_representativas: Union[List[str], str], 
+        umbral: float=0.4, 
+        min_proportion: int=45) -> pl.LazyFrame: 
+        
+        clave = self.clave_plan(frame=frame, columnas_representativas=columnas_representativas, umbral=umbral, min_proportion=min_proportion)
+        if clave in self.planes: 
+            return self.planes[clave]
+        
+        #Renombrado, filtro, nulos y tipos se encadenan sobre un solo LazyFrame para que el optimizador los fusione
+        renombrado = RenameColumn(frame=frame.lazy(), model=self.model).rename_columns()
+        plan = FilterRows(frame=renombrado, model=self.model).filter_rows()
+        plan = self.compilar_nulos(
+            frame=plan, 
+            clave=clave, 
+            columnas_representativas=columnas_representativas, 
+            umbral=umbral, 
+            min_proportion=min_proportion, 
+            perfil=NullProfile.perfil_validacion(frame=renombrado, model=self.model)
+        )
+        
+        #Un plan sobre un DataFrame retiene los datos en memoria, solo se guardan los planes sobre scans
+        if isinstance(frame, pl.LazyFrame): 
+            self.planes[clave] = plan
+        return plan
+    
+    def explain(self, 
+        frame: Union[pl.DataFrame, pl.LazyFrame], 
+        columnas_representativas: Union[List[str], str], 
+        umbral: float=0.4, 
+        min_proportion: int=45, 
+        optimized: bool=True) -> str: 
+        
+        plan = self.compilar(frame=frame, columnas_representativas=columnas_representativas, umbral=umbral, min_proportion=min_proportion)
+        return plan.explain(optimized=optimized)
+
 class DataCleaning: 
-    def __init__(self, frame: Union[pl.DataFrame, pl.LazyFrame], model: BaseModel):
+    def __init__(self, 
+        frame: Union[pl.DataFrame, pl.LazyFrame], 
+        model: BaseModel, 
+        modo: Optional[str]=None, 
+        reutilizar_decisiones: bool=False):
         self.frame = frame
         self.model = model
+        self.modo = modo
+        self.checkpoint = StageCheckpoint(model=model)
+        #Solo un frame que corresponde a la entrada completa del config (el de FrameCollector) debe reutilizar decisiones guardadas
+        self.compilador = PlanCompiler(model=model, reutilizar_decisiones=reutilizar_decisiones, modo=modo)
+        self.clave_plan = None
+    
+    def reanudar_frame(self, etapas: List[Tuple[str, str]]) -> Tuple[int, Union[pl.DataFrame, pl.LazyFrame]]: 
+        if not self.checkpoint.habilitado: 
+            return -1, self.frame
+        
+        flow_logger = get_run_logger()
+        posicion = self.checkpoint.ultima_etapa(etapas=etapas)
+        if posicion < 0: 
+            flow_logger.info('Checkpoint miss: no hay etapas guardadas, se ejecuta el pipeline completo')
+            return posicion, self.frame
+        
+        etapa, parametros = etapas[posicion]
+        flow_logger.info(f'Checkpoint hit: se reanuda el pipeline después de la etapa {etapa}')
+        return posicion, self.checkpoint.leer(etapa=etapa, parametros=parametros)
+    
+    def checkpoint_frame(self, frame: Union[pl.DataFrame, pl.LazyFrame], etapa: str, parametros: str='') -> Union[pl.DataFrame, pl.LazyFrame]: 
+        if not self.checkpoint.activo(etapa): 
+            return frame
+        
+        get_run_logger().info(f'Checkpoint miss: se guarda la salida de la etapa {etapa}')
+        return self.checkpoint.guardar(frame=frame, etapa=etapa, parametros=parametros)
     
     @task
     def rename_columns(self, frame: Union[pl.DataFrame, pl.LazyFrame]) -> Union[pl.DataFrame, pl.LazyFrame]: 
         rename = RenameColumn(frame=frame, model=self.model)
         return rename.rename_columns()
     
+    @task
+    def filter_rows(self, frame: Union[pl.DataFrame, pl.LazyFrame]) -> Union[pl.DataFrame, pl.LazyFrame]: 
+        filtro = FilterRows(frame=frame, model=self.model)
+        return filtro.filter_rows()
+    
     @task
     def null_handler(self, 
         frame: Union[pl.DataFrame, pl.LazyFrame], 
@@ -268,30 +748,111 @@ class DataCleaning:
         umbral: float=0.4,
         min_proportion: int=45) -> Union[pl.DataFrame, pl.LazyFrame]: 
         
-        null_data= NullHandler(frame=frame, model=self.model, umbral=umbral)
-        return null_data.pipeline_null_handler(
+        #El frame de la etapa ya está filtrado, el perfil con los checks diferidos se arma sobre la entrada renombrada
+        return self.compilador.compilar_nulos(
+            frame=frame, 
+            clave=self.clave_plan, 
+            columnas_representativas=columnas_representativas, 
+            umbral=umbral, 
+            min_proportion=min_proportion, 
+            perfil=NullProfile.perfil_validacion(frame=RenameColumn(frame=self.frame.lazy(), model=self.model).rename_columns(), model=self.model)
+        )
+    
+    @task
+    def compilar_plan(self, 
+        frame: Union[pl.DataFrame, pl.LazyFrame], 
+        columnas_representativas: List[str],
+        umbral: float=0.4,
+        min_proportion: int=45) -> pl.LazyFrame: 
+        
+        return self.compilador.compilar(
+            frame=frame, 
             columnas_representativas=columnas_representativas, 
+            umbral=umbral, 
             min_proportion=min_proportion
         )
     
+    def explain_plan(self, 
+        columnas_representativas: List[str],
+        umbral: float=0.4,
+        min_proportion: int=45, 
+        optimized: bool=True) -> str: 
+        
+        return self.compilador.explain(
+            frame=self.frame, 
+            columnas_representativas=columnas_representativas, 
+            umbral=umbral, 
+            min_proportion=min_proportion, 
+            optimized=optimized
+        )
+    
+    @task
+    def guardar_frame(self, frame: Union[pl.DataFrame, pl.LazyFrame]) -> Union[pl.DataFrame, pl.LazyFrame]: 
+        save = SaveFrame(model=self.model)
+        return save.guardar_frame(frame=frame)
+    
     @flow(name='Pipeline Limpieza De Datos Básico')
     def pipeline_data_cleaning(self, 
         columas_representativas: List[str],
         umbral: float=0.4,
-        min_proportion: int=45) -> Union[pl.DataFrame, pl.LazyFrame]: 
+        min_proportion: int=45, 
+        guardar: bool=True) -> Union[pl.DataFrame, pl.LazyFrame]: 
         
-        frame_rename = self.rename_columns(frame=self.frame)
-        frame_null_hanlder = self.null_handler(
-            frame=frame_rename, 
-            columnas_representativas=columas_representativas, 
-            umbral=umbral, 
-            min_proportion=min_proportion
-        )
-        return frame_null_hanlder
+        etapas = [
+            ('rename_columns', ''), 
+            ('filter_rows', ''), 
+            ('null_handler', f'{columas_representativas}|{umbral}|{min_proportion}')
+        ]
+        with FrameCollector.contexto_modo(memoria=self.model.Memory_Params, modo=self.modo): 
+            posicion, frame = self.reanudar_frame(etapas=etapas)
+            
+            if posicion < 0 and not self.checkpoint.habilitado: 
+                #Sin checkpoints el plan completo sale del compilador y se reutiliza si ya se compiló
+                frame = self.compilar_plan(
+                    frame=frame, 
+                    columnas_representativas=columas_representativas, 
+                    umbral=umbral, 
+                    min_proportion=min_proportion
+                )
+            else: 
+                #Con checkpoints cada etapa es una tarea que puede guardar su salida, el plan se sigue armando lazy
+                self.clave_plan = self.compilador.clave_plan(
+                    frame=self.frame, 
+                    columnas_representativas=columas_representativas, 
+                    umbral=umbral, 
+                    min_proportion=min_proportion
+                )
+                frame = frame.lazy()
+                if posicion < 0: 
+                    frame = self.rename_columns(frame=frame)
+                    frame = self.checkpoint_frame(frame, *etapas[0])
+                if posicion < 1: 
+                    frame = self.filter_rows(frame=frame)
+                    frame = self.checkpoint_frame(frame, *etapas[1])
+                if posicion < 2: 
+                    frame = self.null_handler(
+                        frame=frame, 
+                        columnas_representativas=columas_representativas, 
+                        umbral=umbral, 
+                        min_proportion=min_proportion
+                    )
+                    frame = self.checkpoint_frame(frame, *etapas[2])
+            
+            #Un Frame eager de entrada se ejecuta una sola vez en streaming y se devuelve eager
+            if isinstance(self.frame, pl.DataFrame): 
+                frame = frame.collect(engine='streaming')
+            
+            #En modo streaming el resultado no cabe en memoria, el plan siempre se ejecuta con sink sobre la salida
+            if self.modo == 'streaming' and not guardar: 
+                logger.warning('En modo streaming el Frame limpio se guarda con sink y se devuelve el scan de la salida')
+                guardar = True
+            
+            if guardar: 
+                frame = self.guardar_frame(frame=frame)
+            return frame
 
 # Agregar un filtro para frame lazy en caso de querer colectar los datos 
 """
     Posiblemente quitar el frame externo y meterlo en el mismo pipeline y dejar unicamente un parametro 
     parapasar el yaml o toml y obtener el model y frame desde dentro 
 """
-# Agregar un posible guardado de parquet de los datos limpios 
\ No newline at end of file
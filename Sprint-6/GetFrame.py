@@ -1,9 +1,13 @@
 #Importamos las librerías necesarias
 import polars as pl 
 import logging 
-from typing import Union
+from typing import Union, List, Optional
+from pathlib import Path
 import psutil
 from pydantic import BaseModel
+from CacheFrame import ParquetCache
+from SchemaFrame import SchemaOverride
+from SourceFrame import InputSource
 
 #Config del logging 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s-%(levelname)s-%(message)s')
@@ -13,53 +17,257 @@ logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, format='%(asctime)s-%(levelname)s-%(message)s')
 logger = logging.getLogger(__name__)
 
+class ColumnProjection: 
+    def __init__(self, model: BaseModel):
+        self.rename_col = model.Cleaning_Rules.column_rename or {}
+        self.dtype_dict = model.Cleaning_Rules.dtype_override or {}
+        self.mantener_columnas = model.Cleaning_Rules.keep_passthrough_columns
+        
+        self.sales_column = model.Feature_Engineer.sales_column or []
+        self.regiones = model.Analysis_Params.regions
+        self.metricas = [model.Hypotesis_Testing.test_1.metric, model.Hypotesis_Testing.test_2.metric]
+        self.grupos = [model.Hypotesis_Testing.test_1.group_column, model.Hypotesis_Testing.test_2.group_column]
+        
+        columna_año = model.Analysis_Params.year_column
+        self.columna_año = [columna_año] if columna_año is not None else []
+        
+        #La llave del watermark por columna se lee aunque ninguna otra etapa la use
+        incremental = model.Incremental_Params
+        columna_watermark = incremental.watermark_column if incremental.enabled and incremental.watermark == 'columna' else None
+        self.columna_watermark = [columna_watermark] if columna_watermark is not None else []
+    
+    def columnas_config(self) -> List[str]: 
+        return [*self.rename_col.keys(), *self.dtype_dict.keys(), *self.sales_column, *self.regiones, *self.metricas, *self.grupos, *self.columna_año, *self.columna_watermark]
+    
+    def columnas_requeridas(self, columnas_frame: List[str]) -> Optional[List[str]]: 
+        if self.mantener_columnas: 
+            return None
+        
+        #Las columnas del config pueden venir con el nombre renombrado, se traducen al nombre original
+        nombre_original = {nuevo: col for col, nuevo in self.rename_col.items()}
+        requeridas = {nombre_original.get(col, col) for col in self.columnas_config()}
+        return [col for col in columnas_frame if col in requeridas]
+
+class RowFilter: 
+    def __init__(self, model: BaseModel):
+        self.rename_col = model.Cleaning_Rules.column_rename or {}
+        self.columna_año = model.Analysis_Params.year_column
+        self.año_inicio = model.Analysis_Params.relevant_year_start
+        self.mantener_nulos = model.Analysis_Params.keep_null_years
+    
+    def expr_filtro(self, columna: str) -> pl.Expr: 
+        #Las filas sin año se conservan por defecto para que null_handler las impute como antes del filtro
+        filtro = pl.col(columna) >= self.año_inicio
+        if self.mantener_nulos: 
+            filtro = filtro | pl.col(columna).is_null()
+        return filtro
+    
+    def filtro_scan(self) -> Optional[pl.Expr]: 
+        if self.columna_año is None: 
+            return None
+        
+        nombre_original = {nuevo: col for col, nuevo in self.rename_col.items()}
+        return self.expr_filtro(columna=nombre_original.get(self.columna_año, self.columna_año))
+    
+    def filtro_frame(self) -> Optional[pl.Expr]: 
+        if self.columna_año is None: 
+            return None
+        return self.expr_filtro(columna=self.rename_col.get(self.columna_año, self.columna_año))
+
 class FormatFrame: 
     def __init__(self, model: BaseModel):
-        self.archivo = model.Paths.input_file
+        #La conversión del csv a la cache parquet se hace aquí, al leer la entrada para limpiarla
+        self.archivo = InputSource(ParquetCache(model=model).convertir_frame())
         self.null_data_handler = model.Cleaning_Rules.null_values.null_val_csv
+        self.proyeccion = ColumnProjection(model=model)
+        self.filtro = RowFilter(model=model)
+        self.diferida = model.Validation_Params.deferred
+        self.schema_overrides = SchemaOverride(model=model).schema_original()
+    
+    def scan_frame(self, archivos: Optional[List[Path]]=None) -> pl.LazyFrame: 
+        return self.archivo.scan(null_values=self.null_data_handler, schema_overrides=self.schema_overrides, archivos=archivos)
+    
+    def filtro_scan(self) -> Optional[pl.Expr]: 
+        #Con validación diferida los checks del perfil de nulos ven la entrada completa, el filtro de años lo aplica FilterRows en el plan
+        if self.diferida: 
+            return None
+        return self.filtro.filtro_scan()
+    
+    def columnas_frame(self) -> Optional[List[str]]: 
+        columnas_schema = self.scan_frame().collect_schema().names()
+        columnas = self.proyeccion.columnas_requeridas(columnas_frame=columnas_schema)
+        
+        #Las columnas de particion hive siempre se conservan
+        if columnas is not None: 
+            hive = self.archivo.columnas_hive()
+            columnas += [col for col in columnas_schema if col in hive and col not in columnas]
+        return columnas
     
     def formato_eager(self) -> pl.DataFrame: 
+        #Con filtro de filas o varios archivos se lee con scan para que el filtro llegue al lector (row groups con min/max y particiones)
+        if self.filtro_scan() is not None or self.archivo.es_multiple(): 
+            return self.formato_lazy().collect()
+        
+        columnas = self.columnas_frame()
+        
         if self.archivo.suffix == '.csv': 
-            frame = pl.read_csv(self.archivo, null_values=self.null_data_handler)
+            frame = pl.read_csv(self.archivo.fuente_scan(), null_values=self.null_data_handler, schema_overrides=self.schema_overrides, columns=columnas)
         elif self.archivo.suffix == '.parquet': 
-            frame = pl.read_parquet(self.archivo)
+            frame = pl.read_parquet(self.archivo.fuente_scan(), columns=columnas)
         return frame
     
-    def formato_lazy(self) -> pl.LazyFrame: 
+    def formato_lazy(self, archivos: Optional[List[Path]]=None) -> pl.LazyFrame: 
+        columnas = self.columnas_frame()
+        frame = self.scan_frame(archivos=archivos)
+        
+        if columnas is not None: 
+            frame = frame.select(columnas)
+        
+        filtro = self.filtro_scan()
+        if filtro is not None: 
+            frame = frame.filter(filtro)
+        return frame
+
+class MemoryEstimator: 
+    def __init__(self, model: BaseModel):
+        self.archivo = InputSource(ParquetCache(model=model).ruta_frame())
+        self.null_data_handler = model.Cleaning_Rules.null_values.null_val_csv
+        self.rename_col = model.Cleaning_Rules.column_rename
+        self.schema_renombrado = SchemaOverride(model=model).schema_renombrado()
+        self.muestra_filas = model.Memory_Params.muestra_filas
+        self.proyeccion = ColumnProjection(model=model)
+    
+    def dtype_muestra(self, muestra: pl.DataFrame) -> pl.DataFrame: 
+        columnas = self.proyeccion.columnas_requeridas(columnas_frame=muestra.columns)
+        if columnas is not None: 
+            muestra = muestra.select(columnas)
+        
+        muestra = muestra.rename({col: nuevo for col, nuevo in self.rename_col.items() if col in muestra.columns})
+        
+        list_expr = [
+            pl.col(col).cast(dtype, strict=False) 
+            for col, dtype in self.schema_renombrado.items() if col in muestra.columns
+        ]
+        return muestra.with_columns(list_expr)
+    
+    def bytes_por_fila(self, muestra: pl.DataFrame) -> float: 
+        if muestra.height == 0: 
+            return 0
+        return self.dtype_muestra(muestra=muestra).estimated_size()/muestra.height
+    
+    def filas_csv(self) -> int: 
+        with open(self.archivo.primer_archivo(), 'rb') as f: 
+            encabezado = len(f.readline())
+            lineas = [len(f.readline()) for _ in range(self.muestra_filas)]
+        
+        lineas = [linea for linea in lineas if linea > 0]
+        if not lineas: 
+            return 0
+        
+        tamaño_archivo = self.archivo.tamaño() - encabezado*len(self.archivo.archivos())
+        return int(tamaño_archivo/(sum(lineas)/len(lineas)))
+    
+    def estimar_csv(self) -> int: 
+        muestra = self.archivo.scan(null_values=self.null_data_handler).head(self.muestra_filas).collect()
+        
+        if muestra.height < self.muestra_filas: 
+            filas = muestra.height
+        else: 
+            filas = self.filas_csv()
+        return int(self.bytes_por_fila(muestra=muestra)*filas)
+    
+    def tamaño_footer(self) -> Optional[int]: 
+        #pyarrow es opcional, solo con él se leen los tamaños sin comprimir de cada row group del footer
+        try: 
+            import pyarrow.parquet as pq
+        except ImportError: 
+            return None
+        
+        tamaño = 0
+        for archivo in self.archivo.archivos(): 
+            metadata = pq.ParquetFile(archivo).metadata
+            columnas = self.proyeccion.columnas_requeridas(columnas_frame=metadata.schema.names)
+            for grupo in range(metadata.num_row_groups): 
+                row_group = metadata.row_group(grupo)
+                for posicion in range(row_group.num_columns): 
+                    columna = row_group.column(posicion)
+                    if columnas is None or columna.path_in_schema.split('.')[0] in columnas: 
+                        tamaño += columna.total_uncompressed_size
+        return tamaño
+    
+    def estimar_parquet(self) -> int: 
+        tamaño = self.tamaño_footer()
+        if tamaño is not None: 
+            return tamaño
+        
+        #polars no expone los tamaños por row group: sin pyarrow el conteo de filas sale del footer y el tamaño por fila de una muestra
+        frame = self.archivo.scan()
+        filas = frame.select(pl.len()).collect().item()
+        muestra = frame.head(self.muestra_filas).collect()
+        return int(self.bytes_por_fila(muestra=muestra)*filas)
+    
+    def estimar_memoria(self) -> int: 
         if self.archivo.suffix == '.csv': 
-            frame = pl.scan_csv(self.archivo, null_values=self.null_data_handler)
+            return self.estimar_csv()
         elif self.archivo.suffix == '.parquet': 
-            frame = pl.scan_parquet(self.archivo)
-        return frame
+            return self.estimar_parquet()
+        return self.archivo.tamaño()
 
 class FrameCollector: 
     def __init__(self, model: BaseModel):
         self.archivo = model.Paths.input_file
         self.formato = FormatFrame(model=model)
+        self.estimador = MemoryEstimator(model=model)
+        
+        self.memoria = model.Memory_Params
+        self.modo = None
     
-    def decision_frame(self) -> str: 
-        tamaño_archivo = self.archivo.stat().st_size
+    def memoria_disponible(self) -> int: 
         memoria_disponible = psutil.virtual_memory().available
         
-        ratio_eager = memoria_disponible * 0.1 
-        ratio_lazy = memoria_disponible * 0.75 
+        if self.memoria.memoria_maxima_mb is not None: 
+            memoria_disponible = min(memoria_disponible, self.memoria.memoria_maxima_mb*1024**2)
+        return memoria_disponible
+    
+    def estimar_memoria(self) -> int: 
+        return self.estimador.estimar_memoria()
+    
+    @staticmethod
+    def contexto_modo(memoria: BaseModel, modo: Optional[str]) -> pl.Config: 
+        #El tamaño de chunk solo aplica dentro del contexto, la config global de polars no cambia
+        if modo == 'streaming' and memoria.streaming_chunk_size is not None: 
+            return pl.Config(streaming_chunk_size=memoria.streaming_chunk_size)
+        return pl.Config()
+    
+    def decision_frame(self) -> str: 
+        tamaño_archivo = self.estimar_memoria()
+        memoria_disponible = self.memoria_disponible()
+        
+        ratio_eager = memoria_disponible * self.memoria.ratio_eager
+        ratio_lazy = memoria_disponible * self.memoria.ratio_lazy
         
         if tamaño_archivo < ratio_eager: 
-            return 'eager'
+            decision = 'eager'
         elif tamaño_archivo < ratio_lazy: 
-            return 'lazy'
+            decision = 'lazy'
         else: 
-            raise ValueError(f'Archivo {self.archivo.name} demasiado grande, no se puede procesar')
-    
+            decision = 'streaming'
+        
+        logger.info(f'Modo {decision} seleccionado para el archivo {self.archivo.name}: tamaño estimado {tamaño_archivo/1024**2:.2f} MB, memoria disponible {memoria_disponible/1024**2:.2f} MB')
+        return decision
     
     def get_frame(self) -> Union[pl.DataFrame, pl.LazyFrame]: 
         decision = self.decision_frame()
+        self.modo = decision
         
         if decision == 'eager': 
             frame = self.formato.formato_eager()
             logger.info(f'Se obtuvo el Frame en formato eager correctamente para el archvivo {self.archivo.name}')
-        else: 
+        elif decision == 'lazy': 
             frame = self.formato.formato_lazy()
             logger.info(f'Se obtuvo el Frame en formato lazy correctamente para el archvivo {self.archivo.name}')
+        else: 
+            frame = self.formato.formato_lazy()
+            logger.info(f'Se obtuvo el Frame en formato streaming correctamente para el archvivo {self.archivo.name}, el resultado se debe guardar con sink')
         
         return frame
\ No newline at end of file
@@ -0,0 +1,148 @@
+#Importamos las librerías necesarias
+import polars as pl
+import math
+import logging
+from itertools import combinations
+from pydantic import BaseModel
+from typing import Dict, List, Optional, Tuple, Union
+from DataPreProcessing import SaveFrame
+
+#Config del logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s-%(levelname)s-%(message)s')
+logger = logging.getLogger(__name__)
+
+class TStudent: 
+    @staticmethod
+    def fraccion_beta(a: float, b: float, x: float) -> float: 
+        #Fracción continua de la beta incompleta (método de Lentz)
+        pequeño = 1e-300
+        c = 1.0
+        d = 1.0 - (a + b)*x/(a + 1.0)
+        d = 1.0/(d if abs(d) > pequeño else pequeño)
+        resultado = d
+        
+        for m in range(1, 300): 
+            m2 = 2*m
+            numerador = m*(b - m)*x/((a + m2 - 1.0)*(a + m2))
+            d = 1.0 + numerador*d
+            d = 1.0/(d if abs(d) > pequeño else pequeño)
+            c = 1.0 + numerador/c
+            c = c if abs(c) > pequeño else pequeño
+            resultado *= d*c
+            
+            numerador = -(a + m)*(a + b + m)*x/((a + m2)*(a + m2 + 1.0))
+            d = 1.0 + numerador*d
+            d = 1.0/(d if abs(d) > pequeño else pequeño)
+            c = 1.0 + numerador/c
+            c = c if abs(c) > pequeño else pequeño
+            delta = d*c
+            resultado *= delta
+            if abs(delta - 1.0) < 1e-14: 
+                break
+        return resultado
+    
+    @classmethod
+    def beta_incompleta(cls, a: float, b: float, x: float) -> float: 
+        if x <= 0.0: 
+            return 0.0
+        if x >= 1.0: 
+            return 1.0
+        
+        log_beta = math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a*math.log(x) + b*math.log(1.0 - x)
+        if x < (a + 1.0)/(a + b + 2.0): 
+            return math.exp(log_beta)*cls.fraccion_beta(a, b, x)/a
+        return 1.0 - math.exp(log_beta)*cls.fraccion_beta(b, a, 1.0 - x)/b
+    
+    @classmethod
+    def p_valor(cls, t: float, grados: float) -> float: 
+        #scipy es opcional, solo se importa si está instalado y al momento de calcular
+        try: 
+            from scipy.stats import t as distribucion_t
+            return float(2*distribucion_t.sf(abs(t), grados))
+        except ImportError: 
+            return cls.beta_incompleta(grados/2, 0.5, grados/(grados + t*t))
+
+class HypothesisTest: 
+    def __init__(self, model: BaseModel):
+        self.model = model
+        hipotesis = model.Hypotesis_Testing
+        self.pruebas = [hipotesis.test_1, hipotesis.test_2]
+        self.alpha = hipotesis.alpha
+    
+    def pares(self, grupos: List[str]) -> List[Tuple[Tuple[int, str], Tuple[int, str]]]: 
+        return list(combinations(enumerate(grupos), 2))
+    
+    def expr_estadisticas(self) -> List[pl.Expr]: 
+        #Cada grupo de cada prueba aporta conteo, media y varianza, todo en un solo select sobre el frame
+        #Los alias usan la posición de la prueba y del grupo, no su valor, para que nunca se repitan
+        list_expr = []
+        for posicion, prueba in enumerate(self.pruebas): 
+            for indice, grupo in enumerate(prueba.groups): 
+                valores = pl.col(prueba.metric).filter(pl.col(prueba.group_column) == grupo)
+                list_expr.append(valores.count().alias(f'n_{posicion}_{indice}'))
+                list_expr.append(valores.mean().alias(f'media_{posicion}_{indice}'))
+                list_expr.append(valores.var().alias(f'varianza_{posicion}_{indice}'))
+        return list_expr
+    
+    def estadisticas(self, frame: Union[pl.DataFrame, pl.LazyFrame]) -> Dict[str, Optional[float]]: 
+        return frame.lazy().select(self.expr_estadisticas()).collect(engine='streaming').row(0, named=True)
+    
+    def welch(self, 
+        n_1: int, media_1: float, varianza_1: float, 
+        n_2: int, media_2: float, varianza_2: float) -> Tuple[Optional[float], Optional[float], Optional[float]]: 
+        
+        if n_1 < 2 or n_2 < 2: 
+            return None, None, None
+        
+        error_1 = varianza_1/n_1
+        error_2 = varianza_2/n_2
+        error = error_1 + error_2
+        if error == 0: 
+            return None, None, None
+        
+        t = (media_1 - media_2)/math.sqrt(error)
+        grados = error**2/(error_1**2/(n_1 - 1) + error_2**2/(n_2 - 1))
+        return t, grados, TStudent.p_valor(t=t, grados=grados)
+    
+    def resultados(self, frame: Union[pl.DataFrame, pl.LazyFrame]) -> pl.DataFrame: 
+        estadisticas = self.estadisticas(frame=frame)
+        
+        filas = []
+        for posicion, prueba in enumerate(self.pruebas): 
+            if len(prueba.groups) < 2: 
+                logger.warning(f'La prueba {prueba.name} necesita al menos dos grupos, no se ejecuta')
+                continue
+            
+            for (indice_1, grupo_1), (indice_2, grupo_2) in self.pares(grupos=prueba.groups): 
+                grupo = {}
+                for nombre, indice in [('1', indice_1), ('2', indice_2)]: 
+                    grupo[f'n_{nombre}'] = estadisticas[f'n_{posicion}_{indice}']
+                    grupo[f'media_{nombre}'] = estadisticas[f'media_{posicion}_{indice}']
+                    grupo[f'varianza_{nombre}'] = estadisticas[f'varianza_{posicion}_{indice}']
+                
+                t, grados, p_valor = self.welch(**grupo)
+                if p_valor is None: 
+                    logger.warning(f'La prueba {prueba.name} no se puede calcular para {grupo_1} y {grupo_2}, faltan datos o no hay varianza')
+                
+                filas.append({
+                    'prueba': prueba.name,
+                    'metrica': prueba.metric,
+                    'grupo_1': grupo_1,
+                    'grupo_2': grupo_2,
+                    **grupo,
+                    't': t,
+                    'grados_libertad': grados,
+                    'p_valor': p_valor,
+                    'rechazar_h0': p_valor < self.alpha if p_valor is not None else None
+                })
+        
+        return pl.DataFrame(filas)
+    
+    def pipeline_hipotesis(self, frame: Optional[Union[pl.DataFrame, pl.LazyFrame]]=None) -> pl.DataFrame: 
+        if frame is None: 
+            frame = SaveFrame(model=self.model).leer_salida()
+        
+        resultados = self.resultados(frame=frame)
+        for fila in resultados.iter_rows(named=True): 
+            logger.info(f'Prueba {fila["prueba"]} ({fila["grupo_1"]} vs {fila["grupo_2"]}): t={fila["t"]}, p-valor={fila["p_valor"]}, rechazar H0: {fila["rechazar_h0"]}')
+        return resultados
@@ -0,0 +1,93 @@
+#Importamos las librerías necesarias
+import subprocess
+import sys
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+#Config del logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s-%(levelname)s-%(message)s')
+logger = logging.getLogger(__name__)
+
+class ImportBenchmark: 
+    #Las librerías pesadas se importan dentro de las funciones que las usan, ningún punto de entrada debe cargarlas al importarse
+    #Un nombre sin carpeta es un módulo del sprint, los de V1 y V2 llevan su carpeta relativa a la raíz del repo
+    puntos_entrada = [
+        'ReadFile', 'GetFrame', 'DataPreProcessing', 'IncrementalCleaning', 'AnalysisFrame', 'HypothesisFrame', 'BatchCleaning',
+        'V1/EDA', 'V1/Graficacion', 'V1/Hipotesis', 'V2/0.2.0/EDA'
+    ]
+    librerias_pesadas = ['prefect', 'scipy', 'sklearn', 'plotly', 'rapidfuzz']
+    
+    def __init__(self, presupuesto: float=1.0, repeticiones: int=3, modulos: Optional[List[str]]=None):
+        self.presupuesto = presupuesto
+        self.repeticiones = repeticiones
+        self.modulos = modulos or self.puntos_entrada
+        self.directorio = Path(__file__).resolve().parent
+    
+    def ubicar(self, punto: str) -> Tuple[Path, str]: 
+        #Los módulos se importan por nombre, cada uno desde su propia carpeta
+        ruta = Path(punto)
+        if ruta.parent == Path('.'): 
+            return self.directorio, ruta.name
+        return self.directorio.parent / ruta.parent, ruta.name
+    
+    def importtime(self, punto: str) -> str: 
+        #Cada medición corre en un proceso nuevo para no reutilizar módulos ya cargados
+        directorio, modulo = self.ubicar(punto=punto)
+        resultado = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+            cwd=directorio,
+            capture_output=True,
+            text=True
+        )
+        if resultado.returncode != 0: 
+            raise ImportError(f'No se pudo importar {punto}: {resultado.stderr.strip().splitlines()[-1]}')
+        return resultado.stderr
+    
+    def parsear(self, salida: str, modulo: str) -> Dict[str, Any]: 
+        #Formato de cada línea: "import time: self [us] | cumulative | imported package"
+        acumulado = None
+        cargados = set()
+        for linea in salida.splitlines(): 
+            if not linea.startswith('import time:') or '|' not in linea: 
+                continue
+            
+            _, cumulativo, paquete = linea.split('|', 2)
+            paquete = paquete.strip()
+            if not cumulativo.strip().isdigit(): 
+                continue
+            
+            cargados.add(paquete.split('.')[0])
+            if paquete == modulo: 
+                acumulado = int(cumulativo.strip())/1e6
+        
+        return {'segundos': acumulado, 'cargados': cargados}
+    
+    def medir(self, punto: str) -> Dict[str, Any]: 
+        #Se toma la mejor de varias corridas para reducir el ruido del sistema
+        _, modulo = self.ubicar(punto=punto)
+        mediciones = [self.parsear(salida=self.importtime(punto=punto), modulo=modulo) for _ in range(self.repeticiones)]
+        mejor = min(mediciones, key=lambda medicion: medicion['segundos'])
+        
+        prohibidos = set(self.librerias_pesadas) & mejor['cargados']
+        return {'modulo': punto, 'segundos': mejor['segundos'], 'prohibidos': sorted(prohibidos)}
+    
+    def pipeline_benchmark(self) -> bool: 
+        correcto = True
+        for modulo in self.modulos: 
+            medicion = self.medir(punto=modulo)
+            logger.info(f'{modulo}: {medicion["segundos"]:.3f} s (presupuesto {self.presupuesto:.3f} s)')
+            
+            if medicion['segundos'] > self.presupuesto: 
+                logger.error(f'{modulo} supera el presupuesto de importación: {medicion["segundos"]:.3f} s > {self.presupuesto:.3f} s')
+                correcto = False
+            if medicion['prohibidos']: 
+                logger.error(f'{modulo} carga librerías pesadas al importarse: {", ".join(medicion["prohibidos"])}')
+                correcto = False
+        return correcto
+
+if __name__ == '__main__': 
+    #Uso: python ImportBenchmark.py [presupuesto_en_segundos] [modulo o carpeta/modulo ...]
+    presupuesto = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    modulos = sys.argv[2:] or None
+    sys.exit(0 if ImportBenchmark(presupuesto=presupuesto, modulos=modulos).pipeline_benchmark() else 1)
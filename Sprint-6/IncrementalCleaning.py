@@ -0,0 +1,239 @@
+#Importamos las librerías necesarias
+import polars as pl
+import json
+import logging
+from pathlib import Path
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional, Tuple, Union
+from LazyPrefect import flow
+from GetFrame import FormatFrame
+from DataPreProcessing import RenameColumn, FilterRows, NullHandler, NullProfile, DeleteData, DtypeOverride, SaveFrame, FrameUtils, AnalysisNullData, InputData
+
+#Config del logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s-%(levelname)s-%(message)s')
+logger = logging.getLogger(__name__)
+
+class WatermarkState: 
+    def __init__(self, model: BaseModel):
+        self.archivo = Path(model.Incremental_Params.state_file)
+        self.archivo_estadisticas = self.archivo.with_suffix('.parquet')
+    
+    def leer_estado(self) -> Optional[Dict[str, Any]]: 
+        if not self.archivo.exists(): 
+            return None
+        with open(self.archivo, 'r') as f: 
+            return json.load(f)
+    
+    def leer_estadisticas(self) -> Optional[pl.DataFrame]: 
+        if not self.archivo_estadisticas.exists(): 
+            return None
+        return pl.read_parquet(self.archivo_estadisticas)
+    
+    def guardar_estado(self, estado: Dict[str, Any], estadisticas: Optional[pl.DataFrame]=None) -> None: 
+        self.archivo.parent.mkdir(parents=True, exist_ok=True)
+        
+        if estadisticas is not None: 
+            estadisticas.write_parquet(self.archivo_estadisticas)
+        
+        #Se escribe primero en un temporal para no dejar un estado a medias si el proceso falla
+        temporal = self.archivo.with_suffix('.tmp')
+        with open(temporal, 'w') as f: 
+            json.dump(estado, f, indent=2)
+        temporal.replace(self.archivo)
+        logger.info(f'Se guardó el watermark en {self.archivo.name}: {estado["watermark"]}')
+
+class DeltaFrame: 
+    def __init__(self, model: BaseModel):
+        self.formato = FormatFrame(model=model)
+        self.tipo = model.Incremental_Params.watermark
+        
+        rename_col = model.Cleaning_Rules.column_rename or {}
+        nombre_original = {nuevo: col for col, nuevo in rename_col.items()}
+        columna = model.Incremental_Params.watermark_column
+        self.columna = nombre_original.get(columna, columna)
+    
+    def archivos_nuevos(self, procesados: List[str]) -> List[Path]: 
+        return [archivo for archivo in self.formato.archivo.archivos() if str(archivo) not in procesados]
+    
+    def frame_delta(self, watermark: Any) -> Optional[pl.LazyFrame]: 
+        if watermark is None: 
+            return self.formato.formato_lazy()
+        
+        if self.tipo == 'filas': 
+            return self.formato.formato_lazy().slice(watermark)
+        elif self.tipo == 'archivos': 
+            archivos = self.archivos_nuevos(procesados=watermark)
+            if not archivos: 
+                return None
+            return self.formato.formato_lazy(archivos=archivos)
+        else: 
+            #Los nulos no se comparan con el watermark, se dejan pasar para que nuevo_watermark los rechace en vez de perderlos
+            return self.formato.formato_lazy().filter((pl.col(self.columna) > watermark) | pl.col(self.columna).is_null())
+    
+    def nuevo_watermark(self, delta: pl.LazyFrame, watermark: Any) -> Any: 
+        if self.tipo == 'filas': 
+            return (watermark or 0) + FrameUtils.altura(delta)
+        elif self.tipo == 'archivos': 
+            return (watermark or []) + [str(archivo) for archivo in self.archivos_nuevos(procesados=watermark or [])]
+        else: 
+            #El filtro > watermark solo es correcto con una llave creciente y única (id, timestamp), no con columnas como el año
+            resumen = delta.select(
+                pl.col(self.columna).max().alias('maximo'), 
+                pl.col(self.columna).null_count().alias('nulos'), 
+                (pl.col(self.columna).n_unique() < pl.len()).alias('repetidos')
+            ).collect(engine='streaming').row(0, named=True)
+            if resumen['nulos'] > 0: 
+                raise ValueError(f'La columna watermark {self.columna} tiene {resumen["nulos"]} nulos, esas filas nunca pasarían el filtro del watermark')
+            if resumen['repetidos']: 
+                raise ValueError(f'La columna watermark {self.columna} tiene valores repetidos, las filas nuevas con el último valor se perderían; usar el watermark por filas o archivos')
+            
+            maximo = resumen['maximo']
+            if watermark is None or maximo is None: 
+                return maximo if maximo is not None else watermark
+            return max(watermark, maximo)
+
+class FittedStatistics: 
+    def __init__(self, model: BaseModel, columnas_representativas: List[str]):
+        self.model = model
+        self.col_rep = columnas_representativas
+    
+    def ajustar(self, frame: Union[pl.DataFrame, pl.LazyFrame], columnas_target: List[str]) -> pl.DataFrame: 
+        #Se reutiliza la misma tabla de grupos (estadísticas y modas) que la imputación completa
+        analisis = AnalysisNullData(
+            frame=frame.lazy(), 
+            model=self.model, 
+            columnas_representativas=self.col_rep, 
+            columnas_target=columnas_target
+        )
+        return FrameUtils.materializar(analisis.estadisticas_grupo())
+
+class FittedNullHandler: 
+    def __init__(self,
+        model: BaseModel,
+        estado: Dict[str, Any],
+        estadisticas: Optional[pl.DataFrame],
+        columnas_representativas: List[str],
+        min_proportion: int=45):
+        
+        self.model = model
+        self.estado = estado
+        self.estadisticas = estadisticas
+        self.col_rep = columnas_representativas
+        self.min_proportion = min_proportion
+    
+    def expr_filas(self, frame: pl.LazyFrame) -> pl.Expr: 
+        umbral_filas = len(FrameUtils.columnas(frame))*self.estado['umbral']
+        return DeleteData(frame=frame).delete_row(columnas=self.estado['columnas_filas'], umbral_filas=umbral_filas)
+    
+    def imputar(self, frame: pl.LazyFrame) -> pl.LazyFrame: 
+        columnas_target = self.estado['columnas_analizar']
+        estadisticas = self.estadisticas.lazy()
+        
+        input_data = InputData(frame=frame, model=self.model)
+        
+        frame_estadisticas = frame.join(estadisticas, on=self.col_rep, how='left', maintain_order='left', nulls_equal=True)
+        list_expr = [
+            pl.when(pl.col(f'porcentaje_no_nulos_{col}') >= self.min_proportion)
+            .then(input_data.input_data_join(col=col))
+            .otherwise(pl.col(col))
+            .alias(col)
+            for col in columnas_target
+        ]
+        return frame_estadisticas.with_columns(list_expr).drop([col for col in estadisticas.collect_schema().names() if col not in self.col_rep])
+    
+    def pipeline_null_handler(self, frame: pl.LazyFrame) -> pl.LazyFrame: 
+        if self.estado['columnas_filas']: 
+            frame = frame.filter(self.expr_filas(frame=frame))
+        if self.estado['columnas_analizar'] and self.estadisticas is not None: 
+            frame = self.imputar(frame=frame)
+        if self.estado['columnas_eliminadas']: 
+            frame = DeleteData(frame=frame).delete_column(list_col=self.estado['columnas_eliminadas'])
+        
+        return DtypeOverride(frame=frame, model=self.model).dtype_override()
+
+class IncrementalDataCleaning: 
+    def __init__(self, model: BaseModel):
+        self.model = model
+        self.estado = WatermarkState(model=model)
+        self.delta = DeltaFrame(model=model)
+        self.salida = Path(model.Paths.output_file)
+    
+    def preparar_frame(self, frame: pl.LazyFrame) -> pl.LazyFrame: 
+        frame = RenameColumn(frame=frame, model=self.model).rename_columns()
+        return FilterRows(frame=frame, model=self.model).filter_rows()
+    
+    def ajustar_limpieza(self,
+        frame: pl.LazyFrame,
+        columnas_representativas: List[str],
+        umbral: float,
+        min_proportion: int,
+        perfil: Optional[NullProfile]=None) -> Tuple[pl.LazyFrame, Dict[str, Any], Optional[pl.DataFrame]]:
+        
+        null_data = NullHandler(frame=frame, model=self.model, umbral=umbral, columnas_representativas=columnas_representativas, perfil=perfil)
+        frame_limpio = null_data.pipeline_null_handler(columnas_representativas=columnas_representativas, min_proportion=min_proportion)
+        
+        #Las estadísticas se ajustan igual que en la imputación completa, después de eliminar las filas nulas
+        frame_filas = null_data.delete_data_row(frame=frame) if null_data.null_row else frame
+        estadisticas = None
+        if null_data.analyse_null: 
+            estadisticas = FittedStatistics(model=self.model, columnas_representativas=columnas_representativas).ajustar(
+                frame=frame_filas,
+                columnas_target=null_data.analyse_null
+            )
+        
+        return frame_limpio, null_data.decisiones(), estadisticas
+    
+    @flow(name='Pipeline Limpieza De Datos Incremental')
+    def pipeline_incremental(self,
+        columas_representativas: List[str],
+        umbral: float=0.4,
+        min_proportion: int=45) -> Optional[pl.LazyFrame]:
+        
+        estado = self.estado.leer_estado()
+        watermark = estado['watermark'] if estado is not None else None
+        
+        delta = self.delta.frame_delta(watermark=watermark)
+        if delta is None or FrameUtils.altura(delta) == 0: 
+            logger.info(f'No hay datos nuevos después del watermark {watermark}, no se procesa nada')
+            return None
+        
+        #El watermark se calcula antes de guardar el lote, una llave de columna inválida no deja lotes a medias
+        nuevo_watermark = self.delta.nuevo_watermark(delta=delta, watermark=watermark)
+        
+        frame = self.preparar_frame(frame=delta)
+        if estado is None: 
+            logger.info('No existe un estado previo, se ajusta la limpieza con todo el historial')
+            #Con validación diferida los checks van en el perfil de la primera corrida, los lotes siguientes no traen todas las categorías
+            frame_limpio, decisiones, estadisticas = self.ajustar_limpieza(
+                frame=frame,
+                columnas_representativas=columas_representativas,
+                umbral=umbral,
+                min_proportion=min_proportion,
+                perfil=NullProfile.perfil_validacion(frame=RenameColumn(frame=delta, model=self.model).rename_columns(), model=self.model)
+            )
+            lote = 0
+        else: 
+            decisiones = estado['decisiones']
+            estadisticas = self.estado.leer_estadisticas()
+            frame_limpio = FittedNullHandler(
+                model=self.model,
+                estado=decisiones,
+                estadisticas=estadisticas,
+                columnas_representativas=columas_representativas,
+                min_proportion=min_proportion
+            ).pipeline_null_handler(frame=frame.lazy())
+            lote = estado['lote'] + 1
+        
+        #Cada corrida agrega un lote nuevo al dataset de salida
+        archivo_lote = self.salida / f'lote_{lote:05d}.parquet'
+        if self.model.Output_Params.partition_by: 
+            archivo_lote = self.salida / f'lote_{lote:05d}'
+        frame_guardado = SaveFrame(model=self.model, archivo=archivo_lote).guardar_frame(frame=frame_limpio.lazy())
+        
+        nuevo_estado = {
+            'watermark': nuevo_watermark,
+            'lote': lote,
+            'decisiones': decisiones
+        }
+        self.estado.guardar_estado(estado=nuevo_estado, estadisticas=estadisticas if estado is None else None)
+        return frame_guardado
@@ -0,0 +1,42 @@
+#Importamos las librerías necesarias
+import importlib
+from typing import Any, Callable, Optional
+
+class PrefectDiferido: 
+    #prefect tarda más de un segundo en importarse, solo se carga cuando se usa la primera tarea o flujo
+    def __init__(self, funcion: Callable, decorador: str, opciones: dict):
+        self.funcion = funcion
+        self.decorador = decorador
+        self.opciones = opciones
+        self.real = None
+        self.__name__ = funcion.__name__
+        self.__doc__ = funcion.__doc__
+        self.__wrapped__ = funcion
+    
+    def compilar(self) -> Any: 
+        if self.real is None: 
+            prefect = importlib.import_module('prefect')
+            self.real = getattr(prefect, self.decorador)(**self.opciones)(self.funcion)
+        return self.real
+    
+    def __get__(self, instancia: Any, dueño: Optional[type]=None) -> Any: 
+        #Los métodos se enlazan con el descriptor propio de prefect para conservar su manejo de self
+        if instancia is None: 
+            return self
+        return self.compilar().__get__(instancia, dueño)
+    
+    def __call__(self, *args, **kwargs) -> Any: 
+        return self.compilar()(*args, **kwargs)
+
+def task(funcion: Optional[Callable]=None, **opciones) -> Any: 
+    if funcion is None: 
+        return lambda funcion: PrefectDiferido(funcion=funcion, decorador='task', opciones=opciones)
+    return PrefectDiferido(funcion=funcion, decorador='task', opciones=opciones)
+
+def flow(funcion: Optional[Callable]=None, **opciones) -> Any: 
+    if funcion is None: 
+        return lambda funcion: PrefectDiferido(funcion=funcion, decorador='flow', opciones=opciones)
+    return PrefectDiferido(funcion=funcion, decorador='flow', opciones=opciones)
+
+def get_run_logger() -> Any: 
+    return importlib.import_module('prefect').get_run_logger()
@@ -1,27 +1,117 @@
 #Importacion de librerías importantes
 import yaml
 import tomli
+import json
+import inspect
+import hashlib
+import pydantic
 import logging 
 from pathlib import Path
-from pydantic import BaseModel
+from typing import List, Optional
+from pydantic import BaseModel, ValidationError
 from ValidatorConfig import ValidatorConfig
+from SourceFrame import InputSource
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s-%(levelname)s-%(message)s')
 logger = logging.getLogger(__name__)
 
+class ConfigCache: 
+    def __init__(self, archivo: Path, solo_lectura: bool=False):
+        self.archivo = archivo
+        self.solo_lectura = solo_lectura
+        self.directorio = archivo.parent / '.cache_config'
+    
+    @staticmethod
+    def modulos_esquema() -> List[Path]: 
+        #Los validadores importan módulos del sprint (CheckFrame, SourceFrame, CacheFrame, ...), se siguen sus imports hasta cerrar el conjunto
+        sprint = Path(inspect.getfile(ValidatorConfig)).parent
+        pendientes = [inspect.getmodule(ValidatorConfig)]
+        archivos = set()
+        while pendientes: 
+            modulo = pendientes.pop()
+            archivo = Path(inspect.getfile(modulo))
+            if archivo in archivos or archivo.parent != sprint: 
+                continue
+            archivos.add(archivo)
+            for valor in vars(modulo).values(): 
+                importado = inspect.getmodule(valor)
+                if importado is not None and getattr(importado, '__file__', None) is not None: 
+                    pendientes.append(importado)
+        return sorted(archivos)
+    
+    @staticmethod
+    def version_esquema() -> bytes: 
+        #El código de los validadores, el de los módulos que importan y la versión de pydantic también invalidan los configs guardados
+        codigo = b''.join(archivo.read_bytes() for archivo in ConfigCache.modulos_esquema())
+        return hashlib.sha256(codigo + pydantic.VERSION.encode('utf-8')).digest()
+    
+    def clave_cache(self) -> str: 
+        with open(self.archivo, 'rb') as f: 
+            return hashlib.sha256(f.read() + self.version_esquema()).hexdigest()[:16]
+    
+    def ruta_cache(self) -> Path: 
+        return self.directorio / f'{self.archivo.stem}-{self.clave_cache()}.json'
+    
+    def leer(self) -> Optional[BaseModel]: 
+        try: 
+            ruta = self.ruta_cache()
+            if not ruta.exists(): 
+                return None
+            with open(ruta, 'r', encoding='utf-8') as f: 
+                guardado = json.load(f)
+            #La validación guardada solo sirve si los archivos de entrada no cambiaron
+            if InputSource(guardado['entrada']).huella() != guardado['huella']: 
+                return None
+        except (OSError, ValueError, KeyError, TypeError) as e: 
+            logger.warning(f'No se pudo leer la cache del archivo {self.archivo.name}, se vuelve a validar: {str(e)}')
+            return None
+        
+        #Los checks sobre los datos ya pasaron con esta misma entrada, la salida se vuelve a revisar en cada corrida
+        try: 
+            validador = ValidatorConfig.model_validate_json(guardado['modelo'], context={'solo_lectura': self.solo_lectura, 'desde_cache': True})
+        except ValidationError as e: 
+            logger.warning(f'La cache del archivo {self.archivo.name} no es válida, se vuelve a validar: {str(e)}')
+            return None
+        
+        logger.info(f'Se reutilizó la validación en cache del archivo {self.archivo.name}')
+        return validador
+    
+    def guardar(self, validador: BaseModel) -> None: 
+        #Un directorio sin permisos de escritura solo deja la corrida sin cache
+        try: 
+            ruta = self.ruta_cache()
+            ruta.parent.mkdir(parents=True, exist_ok=True)
+            ruta_temporal = ruta.with_suffix('.json.tmp')
+            
+            guardado = {
+                'entrada': str(validador.Paths.input_file),
+                'huella': InputSource(validador.Paths.input_file).huella(),
+                'modelo': validador.model_dump_json(warnings=False)
+            }
+            with open(ruta_temporal, 'w', encoding='utf-8') as f: 
+                json.dump(guardado, f)
+            ruta_temporal.replace(ruta)
+        except OSError as e: 
+            logger.warning(f'No se pudo guardar la cache del archivo {self.archivo.name}: {str(e)}')
+
 class ReadConfig: 
-    def __init__(self, archivo: str):
+    def __init__(self, archivo: str, usar_cache: bool=True, solo_lectura: bool=False):
         self.archivo = Path(archivo)
+        self.usar_cache = usar_cache
+        #En solo lectura (análisis, hipótesis) la salida puede existir porque no se va a escribir
+        self.solo_lectura = solo_lectura
         
         if self.archivo.suffix not in ['.yaml', '.yml', '.toml']: 
             raise ValueError(f'El archivo {self.archivo.name} deber ser un archivo yaml o toml')
+        
+        self.cache = ConfigCache(archivo=self.archivo, solo_lectura=solo_lectura)
     
     def read_yaml(self) -> BaseModel: 
         try: 
             with open(self.archivo, 'r') as f: 
                 file = yaml.safe_load(f)
             logger.info(f'Se leyó correctamente el archivo {self.archivo.name}')
-            validador = ValidatorConfig(**file)
+            validador = ValidatorConfig.model_validate(file, context={'solo_lectura': self.solo_lectura})
             logger.info(f'Se valido correctamente el archivo {self.archivo.name}')
             return validador
         except yaml.YAMLError: 
@@ -36,7 +126,7 @@ class ReadConfig:
             with open(self.archivo, 'rb') as f: 
                 file = tomli.load(f)
             logger.info(f'El archivo {self.archivo.name} se leyó correctamente')
-            validador = ValidatorConfig(**file)
+            validador = ValidatorConfig.model_validate(file, context={'solo_lectura': self.solo_lectura})
             logger.info(f'Se valido el archivo {self.archivo.name} correctamente')
             return validador
         except tomli.TOMLDecodeError: 
@@ -47,9 +137,18 @@ class ReadConfig:
             raise
     
     def read_config(self) -> BaseModel: 
+        if self.usar_cache: 
+            validador = self.cache.leer()
+            if validador is not None: 
+                return validador
+        
         if self.archivo.suffix in ['.yaml', '.yml']: 
-            return self.read_yaml()
+            validador = self.read_yaml()
         else: 
-            return self.read_toml()
+            validador = self.read_toml()
+        
+        if self.usar_cache: 
+            self.cache.guardar(validador=validador)
+        return validador
 
 
@@ -0,0 +1,24 @@
+#Importamos las librerías necesarias
+import polars as pl
+from typing import Dict
+from pydantic import BaseModel
+
+class SchemaOverride: 
+    tipos_polars = {
+        'Int32': pl.Int32,
+        'Float32': pl.Float32,
+        'Date': pl.Date,
+        'Utf8': pl.Utf8
+    }
+    
+    def __init__(self, model: BaseModel):
+        self.rename_col = model.Cleaning_Rules.column_rename or {}
+        self.dtype_dict = model.Cleaning_Rules.dtype_override or {}
+    
+    def schema_renombrado(self) -> Dict[str, pl.DataType]: 
+        return {col: self.tipos_polars[dtype] for col, dtype in self.dtype_dict.items()}
+    
+    def schema_original(self) -> Dict[str, pl.DataType]: 
+        #dtype_override usa los nombres renombrados, el lector necesita los nombres del archivo
+        nombre_original = {nuevo: col for col, nuevo in self.rename_col.items()}
+        return {nombre_original.get(col, col): dtype for col, dtype in self.schema_renombrado().items()}
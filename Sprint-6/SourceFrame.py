@@ -0,0 +1,107 @@
+#Importamos las librerías necesarias
+import glob
+import hashlib
+import polars as pl
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+class InputSource: 
+    formatos = ['.csv', '.parquet']
+    
+    def __init__(self, ruta: Union[str, Path]):
+        self.ruta = Path(ruta)
+        self.lista_archivos = None
+    
+    def es_glob(self) -> bool: 
+        return any(caracter in str(self.ruta) for caracter in '*?[')
+    
+    def es_multiple(self) -> bool: 
+        return self.es_glob() or self.ruta.is_dir()
+    
+    def buscar_archivos(self) -> List[Path]: 
+        if self.ruta.is_dir(): 
+            return sorted(archivo for archivo in self.ruta.rglob('*') if archivo.is_file() and archivo.suffix in self.formatos)
+        if self.es_glob(): 
+            return sorted(Path(archivo) for archivo in glob.glob(str(self.ruta), recursive=True) if Path(archivo).is_file())
+        return [self.ruta]
+    
+    def archivos(self) -> List[Path]: 
+        if self.lista_archivos is None: 
+            self.lista_archivos = self.buscar_archivos()
+        return self.lista_archivos
+    
+    def primer_archivo(self) -> Path: 
+        archivos = self.archivos()
+        if not archivos: 
+            raise FileNotFoundError(f'No se encontraron archivos csv o parquet en {self.ruta}')
+        return archivos[0]
+    
+    @property
+    def suffix(self) -> str: 
+        return self.primer_archivo().suffix
+    
+    @property
+    def name(self) -> str: 
+        return self.ruta.name
+    
+    def fuente_scan(self) -> str: 
+        #Los directorios se leen con glob recursivo para incluir todos los shards
+        if self.ruta.is_dir(): 
+            return str(self.ruta / '**' / f'*{self.suffix}')
+        return str(self.ruta)
+    
+    def tamaño(self) -> int: 
+        return sum(archivo.stat().st_size for archivo in self.archivos())
+    
+    def huella(self) -> str: 
+        #Ruta, tamaño y mtime de cada archivo, suficiente para detectar cambios sin leerlos
+        archivos = []
+        for archivo in self.archivos(): 
+            stat = archivo.stat()
+            archivos.append(f'{archivo.resolve()}|{stat.st_size}|{stat.st_mtime_ns}')
+        return '\n'.join(archivos)
+    
+    def huella_hash(self, contexto: str='') -> str: 
+        #Hash de la huella junto con lo que también invalida el resultado (config, parámetros)
+        return hashlib.sha256((self.huella() + contexto).encode('utf-8')).hexdigest()
+    
+    def particiones(self) -> Dict[str, str]: 
+        if not self.es_multiple(): 
+            return {}
+        
+        #Las columnas de particion vienen de los segmentos clave=valor de la ruta
+        partes = self.primer_archivo().parts
+        return dict(parte.split('=', 1) for parte in partes[:-1] if '=' in parte)
+    
+    def columnas_hive(self) -> List[str]: 
+        return list(self.particiones().keys())
+    
+    def particiones_csv(self, frame: pl.LazyFrame, schema_overrides: Optional[Dict[str, pl.DataType]]=None) -> pl.LazyFrame: 
+        list_expr = []
+        
+        for col, valor in self.particiones().items(): 
+            particion = pl.col('ruta_archivo').str.extract(f'{col}=([^/\\\\]+)')
+            if schema_overrides and col in schema_overrides: 
+                particion = particion.cast(schema_overrides[col])
+            elif valor.lstrip('-').isdigit(): 
+                particion = particion.cast(pl.Int64)
+            list_expr.append(particion.alias(col))
+        
+        return frame.with_columns(list_expr).drop('ruta_archivo')
+    
+    def scan(self, 
+        null_values: Optional[List[str]]=None, 
+        schema_overrides: Optional[Dict[str, pl.DataType]]=None, 
+        archivos: Optional[List[Path]]=None) -> pl.LazyFrame: 
+        
+        fuente = [str(archivo) for archivo in archivos] if archivos is not None else self.fuente_scan()
+        
+        if self.suffix == '.csv': 
+            if not self.es_multiple(): 
+                return pl.scan_csv(fuente, null_values=null_values, schema_overrides=schema_overrides)
+            
+            #scan_csv no soporta hive, las particiones se extraen de la ruta de cada shard
+            frame = pl.scan_csv(fuente, null_values=null_values, schema_overrides=schema_overrides, include_file_paths='ruta_archivo')
+            return self.particiones_csv(frame=frame, schema_overrides=schema_overrides)
+        
+        return pl.scan_parquet(fuente, hive_partitioning=True if self.es_multiple() else None)
@@ -21,4 +21,21 @@ class StrategyFE(str, Enum):
     MAX = 'max'
 
 class StrategyTest(str, Enum): 
-    T_TEST_IND = 'ttest_ind'
\ No newline at end of file
+    T_TEST_IND = 'ttest_ind'
+
+class StrategyCompression(str, Enum): 
+    ZSTD = 'zstd'
+    SNAPPY = 'snappy'
+    LZ4 = 'lz4'
+    GZIP = 'gzip'
+    BROTLI = 'brotli'
+    UNCOMPRESSED = 'uncompressed'
+
+class StrategyWatermark(str, Enum): 
+    FILAS = 'filas'
+    ARCHIVOS = 'archivos'
+    COLUMNA = 'columna'
+
+class StrategyCheckpoint(str, Enum): 
+    IPC = 'ipc'
+    PARQUET = 'parquet'
\ No newline at end of file
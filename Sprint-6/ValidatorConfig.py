@@ -1,25 +1,31 @@
 from pathlib import Path
-import polars as pl
-from pydantic import BaseModel, Field, field_validator, model_validator
+from pydantic import BaseModel, Field, ValidationInfo, field_validator, model_validator
 from typing import Dict, List, Optional, Union
-from Strategies import StrategyFE, StrategyTest, StrategyDataType, StrategyNullCatImputer, StrategyNullNumImput
+from Strategies import StrategyFE, StrategyTest, StrategyDataType, StrategyNullCatImputer, StrategyNullNumImput, StrategyCompression, StrategyWatermark, StrategyCheckpoint
+from CacheFrame import ParquetCache
+from SchemaFrame import SchemaOverride
+from SourceFrame import InputSource
+from CheckFrame import DataCheck
 
 class PathConfigValidator(BaseModel): 
     input_file: str
     output_file: str 
+    cache_dir: Optional[str] = None
     
     @field_validator('input_file')
     def archivo_existente(cls, v): 
         path = Path(v)
-        if not path.exists(): 
+        fuente = InputSource(path)
+        if fuente.es_multiple(): 
+            if not fuente.archivos(): 
+                raise FileNotFoundError(f'No se encontraron archivos csv o parquet en {v}')
+        elif not path.exists(): 
             raise FileNotFoundError(f'El archivo {path.name} no existe')
         return path
     
     @field_validator('output_file')
     def archivo_salida_existente(cls, v): 
         path = Path(v)
-        if path.exists(): 
-            raise FileExistsError(f'El archivo {path.name} existe y no se puede sobreescribir')
         if path.suffix not in ['.csv', '.parquet']: 
             raise ValueError(f'El archivo {path.name} debe ser un archivo csv o parquet')
         return v
@@ -28,15 +34,18 @@ class NullHanlderValidator(BaseModel):
     null_val_csv: List[str] = Field(min_length=1)
     null_imput_num_operation: StrategyNullNumImput
     null_imput_cat_operation: Union[StrategyNullCatImputer, str]
+    max_window_groups: int = Field(default=100000, ge=0)
 
 class CleaningRulesValidator(BaseModel): 
     column_rename: Optional[Dict[str, str]] = Field(min_length=1)
     dtype_override: Optional[Dict[str, StrategyDataType]] = Field(min_length=1)
     null_values: Optional[NullHanlderValidator]
+    keep_passthrough_columns: bool = False
 
 class FeatureEngineerValidator(BaseModel): 
     sales_column: Optional[List[str]] = Field(default=None, min_length=1)
     operation: Optional[StrategyFE]
+    output_column: Optional[str] = None
     
     @model_validator(mode='after')
     def operacion_valida(self): 
@@ -55,6 +64,8 @@ class FeatureEngineerValidator(BaseModel):
 
 class AnalysisParams(BaseModel): 
     relevant_year_start: int
+    year_column: Optional[str] = None
+    keep_null_years: bool = True
     top_platforms_count: int
     regions: List[str] = Field(min_length=1)
     top_regional_count: int
@@ -64,12 +75,70 @@ class TestValidator(BaseModel):
     name: str
     groups: List[str] = Field(min_length=1)
     metric: str
+    group_column: Optional[str] = None
+    
+    @field_validator('groups')
+    def grupos_distintos(cls, v): 
+        repetidos = sorted({grupo for grupo in v if v.count(grupo) > 1})
+        if repetidos: 
+            raise ValueError(f'Los grupos {repetidos} están repetidos en la prueba')
+        return v
 
 class HypotesisTesting(BaseModel): 
     test_1: TestValidator
     test_2: TestValidator
     test_criteria: StrategyTest
     alpha: float = Field(le=1)
+    
+    @model_validator(mode='after')
+    def columna_grupos(self): 
+        #Sin columna explícita la primera prueba compara plataformas y la segunda géneros
+        if self.test_1.group_column is None: 
+            self.test_1.group_column = 'platform'
+        if self.test_2.group_column is None: 
+            self.test_2.group_column = 'genre'
+        return self
+
+class MemoryParamsValidator(BaseModel): 
+    ratio_eager: float = Field(default=0.1, gt=0, le=1)
+    ratio_lazy: float = Field(default=0.75, gt=0, le=1)
+    memoria_maxima_mb: Optional[int] = Field(default=None, gt=0)
+    streaming_chunk_size: Optional[int] = Field(default=None, gt=0)
+    muestra_filas: int = Field(default=5000, gt=0)
+    
+    @model_validator(mode='after')
+    def ratios_validos(self): 
+        if self.ratio_eager > self.ratio_lazy: 
+            raise ValueError('El ratio eager debe ser menor o igual al ratio lazy')
+        return self
+
+class OutputParamsValidator(BaseModel): 
+    compression: StrategyCompression = StrategyCompression.ZSTD
+    compression_level: Optional[int] = None
+    row_group_size: Optional[int] = Field(default=None, gt=0)
+    statistics: bool = True
+    partition_by: Optional[List[str]] = Field(default=None, min_length=1)
+
+class IncrementalParamsValidator(BaseModel): 
+    enabled: bool = False
+    state_file: str = '.incremental/estado.json'
+    watermark: StrategyWatermark = StrategyWatermark.FILAS
+    watermark_column: Optional[str] = None
+    
+    @model_validator(mode='after')
+    def columna_watermark(self): 
+        if self.watermark == StrategyWatermark.COLUMNA and self.watermark_column is None: 
+            raise ValueError('El watermark por columna necesita la columna watermark_column')
+        return self
+
+class CheckpointParamsValidator(BaseModel): 
+    enabled: bool = False
+    checkpoint_dir: str = '.checkpoints'
+    formato: StrategyCheckpoint = StrategyCheckpoint.IPC
+    stages: List[str] = Field(default=['rename_columns', 'filter_rows', 'null_handler'], min_length=1)
+
+class ValidationParamsValidator(BaseModel): 
+    deferred: bool = False
 
 class ValidatorConfig(BaseModel): 
     Paths: PathConfigValidator
@@ -77,31 +146,72 @@ class ValidatorConfig(BaseModel):
     Feature_Engineer: FeatureEngineerValidator
     Analysis_Params: AnalysisParams
     Hypotesis_Testing: HypotesisTesting
+    Memory_Params: MemoryParamsValidator = Field(default_factory=MemoryParamsValidator)
+    Output_Params: OutputParamsValidator = Field(default_factory=OutputParamsValidator)
+    Incremental_Params: IncrementalParamsValidator = Field(default_factory=IncrementalParamsValidator)
+    Checkpoint_Params: CheckpointParamsValidator = Field(default_factory=CheckpointParamsValidator)
+    Validation_Params: ValidationParamsValidator = Field(default_factory=ValidationParamsValidator)
     
     @model_validator(mode='after')
-    def columnas_existentes(self): 
-        archivo = self.Paths.input_file
-        if archivo.suffix == '.csv': 
-            schema = pl.scan_csv(archivo).collect_schema()
-        else: 
-            schema = pl.scan_parquet(archivo).collect_schema()
+    def salida_existente(self, info: ValidationInfo): 
+        solo_lectura = bool(info.context and info.context.get('solo_lectura'))
+        return self.revisar_salida(solo_lectura=solo_lectura)
+    
+    def revisar_salida(self, solo_lectura: bool=False): 
+        path = Path(self.Paths.output_file)
+        incremental = self.Incremental_Params.enabled
+        
+        #En modo incremental la salida es un dataset al que se le agregan lotes, en solo lectura (análisis) solo se lee
+        if path.exists() and not incremental and not solo_lectura: 
+            raise FileExistsError(f'El archivo {path.name} existe y no se puede sobreescribir')
+        if incremental and path.suffix != '.parquet': 
+            raise ValueError(f'La salida incremental {path.name} debe ser un dataset parquet')
+        return self
+    
+    @model_validator(mode='after')
+    def columnas_existentes(self, info: ValidationInfo): 
+        #Un config leído de la cache ya pasó estos checks con la misma entrada
+        if info.context and info.context.get('desde_cache'): 
+            return self
+        
+        archivo = InputSource(ParquetCache(model=self).ruta_frame())
+        schema = archivo.scan().collect_schema()
         
         column_rename = self.Cleaning_Rules.column_rename.keys()
         for col in column_rename: 
             if col not in schema: 
                 raise ValueError(f'La columna {col} no se encuentra en el Frame')
         
+        #Las llaves hive ya llegan como columnas, renombrar otra columna al mismo nombre las duplica
+        columnas_hive = archivo.columnas_hive()
+        for col, nuevo in self.Cleaning_Rules.column_rename.items(): 
+            if nuevo in columnas_hive and col != nuevo: 
+                raise ValueError(f'La columna {col} se renombra a {nuevo}, que ya es una llave de partición hive de la entrada; quitarla de column_rename o renombrar la partición')
+        
         dtype = self.Cleaning_Rules.dtype_override.keys()
         col_rename_value = self.Cleaning_Rules.column_rename.values()
         for col in dtype: 
             if col not in col_rename_value: 
                 raise ValueError(f'La columna {col} no se ecuentra en el Frame, verificar la renombración de las columnas')
         
-        list_sales = self.Feature_Engineer.sales_column
+        list_sales = self.Feature_Engineer.sales_column or []
         for col in list_sales: 
             if col not in schema and col not in col_rename_value: 
                 raise ValueError(f'La columna {col} no se encuentra en el Frame')
         
+        columna_año = self.Analysis_Params.year_column
+        if columna_año is not None and columna_año not in schema and columna_año not in col_rename_value: 
+            raise ValueError(f'La columna {columna_año} no se encuentra en el Frame')
+        if columna_año is not None: 
+            #El filtro compara la columna con relevant_year_start, el tipo final (dtype_override o el del archivo) debe ser numérico
+            rename_col = self.Cleaning_Rules.column_rename
+            nombre_original = {nuevo: col for col, nuevo in rename_col.items()}
+            tipo_año = SchemaOverride(model=self).schema_renombrado().get(rename_col.get(columna_año, columna_año))
+            if tipo_año is None: 
+                tipo_año = schema.get(nombre_original.get(columna_año, columna_año))
+            if tipo_año is not None and not tipo_año.is_numeric(): 
+                raise ValueError(f'La columna de años {columna_año} es de tipo {tipo_año}, debe ser numérica para filtrar con relevant_year_start')
+        
         regiones = self.Analysis_Params.regions
         for reg in regiones: 
             if reg not in schema and reg not in col_rename_value: 
@@ -113,33 +223,30 @@ class ValidatorConfig(BaseModel):
             raise ValueError(f'La columna {metrica_1} no se encuentra en el Frame')
         if metrica_2 not in schema and metrica_2 not in col_rename_value: 
             raise ValueError(f'La columna {metrica_2} no se encuentra en el Frame')
+        for test in [self.Hypotesis_Testing.test_1, self.Hypotesis_Testing.test_2]: 
+            if test.group_column not in schema and test.group_column not in col_rename_value: 
+                raise ValueError(f'La columna de grupos {test.group_column} no se encuentra en el Frame')
+        columna_watermark = self.Incremental_Params.watermark_column
+        if columna_watermark is not None and columna_watermark not in schema and columna_watermark not in col_rename_value: 
+            raise ValueError(f'La columna {columna_watermark} no se encuentra en el Frame')
+        
+        particiones = self.Output_Params.partition_by or []
+        for col in particiones: 
+            if col not in schema and col not in col_rename_value: 
+                raise ValueError(f'La columna de particion {col} no se encuentra en el Frame')
+        if particiones and Path(self.Paths.output_file).suffix != '.parquet': 
+            raise ValueError('El guardado con partition_by solo está disponible para archivos parquet')
+        
         if metrica_1 != metrica_2: 
             raise ValueError(f'Las metricas para la hipotesis deben ser identicas no diferentes')
         return self
     
     @model_validator(mode='after')
-    def valor_existente(self): 
-        archivo = self.Paths.input_file
-        frame = pl.scan_csv(archivo, null_values=['tbd', 'TBD', 'N/A', 'nan', ''])
-        
-        sample = frame.slice(0, 1000).collect(engine='streaming')
-        pop_platform = self.Analysis_Params.popular_platform_corr
-        
-        filtro_pop_platform = sample.filter(pl.col('Platform') == pop_platform)
-        if filtro_pop_platform.height < 1: 
-            raise ValueError(f'La categoría {pop_platform} no existe en el Frame')
-        
-        grupo_test_1 = self.Hypotesis_Testing.test_1.groups
-        grupo_test_2 = self.Hypotesis_Testing.test_2.groups
-        
-        for cat in grupo_test_1: 
-            filtro = sample.filter(pl.col('Platform') == cat)
-            if filtro.height < 1: 
-                raise ValueError(f'La categoria {cat} no existe en el Frame')
+    def valor_existente(self, info: ValidationInfo): 
+        #Con validación diferida estos checks se hacen al inicio del pipeline, sobre la entrada sin filtrar
+        if self.Validation_Params.deferred or (info.context and info.context.get('desde_cache')): 
+            return self
         
-        for cat in grupo_test_2: 
-            filtro = sample.filter(pl.col('Genre') == cat)
-            if filtro.height < 1: 
-                raise ValueError(f'La categoria {cat} no existe en el Frame')
+        DataCheck(model=self).revisar_archivo(archivo=InputSource(ParquetCache(model=self).ruta_frame()))
         return self
 
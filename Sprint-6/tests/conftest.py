@@ -0,0 +1,76 @@
+#Importamos las librerías necesarias
+import sys
+import random
+import yaml
+import polars as pl
+import pytest
+from pathlib import Path
+from typing import Any, Dict
+
+#Los módulos del sprint se importan por nombre, igual que en los scripts
+SPRINT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SPRINT))
+
+def datos_juegos(filas: int=400, semilla: int=7) -> pl.DataFrame: 
+    #Frame chico con las columnas del dataset de juegos, nulos y 'tbd' incluidos
+    azar = random.Random(semilla)
+    plataformas = ['PS4', 'XOne', 'PC', 'Wii']
+    generos = ['Action', 'Sports', 'Puzzle']
+    
+    def nulo(valor: Any, probabilidad: float) -> Any: 
+        return None if azar.random() < probabilidad else valor
+    
+    return pl.DataFrame({
+        'Name': [f'juego_{i}' for i in range(filas)],
+        'Platform': [plataformas[i % len(plataformas)] for i in range(filas)],
+        'Year_of_Release': [nulo(azar.randint(2005, 2016), 0.05) for _ in range(filas)],
+        'Genre': [nulo(generos[i % len(generos)], 0.05) for i in range(filas)],
+        'NA_sales': [round(azar.random(), 2) for _ in range(filas)],
+        'EU_sales': [round(azar.random(), 2) for _ in range(filas)],
+        'JP_sales': [round(azar.random(), 2) for _ in range(filas)],
+        'Other_sales': [round(azar.random()/10, 2) for _ in range(filas)],
+        'Critic_Score': [nulo(float(azar.randint(40, 95)), 0.3) for _ in range(filas)],
+        'User_Score': [nulo('tbd' if azar.random() < 0.1 else f'{azar.uniform(3, 9.5):.1f}', 0.2) for _ in range(filas)],
+        'Rating': [nulo(azar.choice(['E', 'T', 'M']), 0.3) for _ in range(filas)]
+    })
+
+def actualizar(base: Dict[str, Any], cambios: Dict[str, Any]) -> Dict[str, Any]: 
+    for llave, valor in cambios.items(): 
+        if isinstance(valor, dict) and isinstance(base.get(llave), dict): 
+            actualizar(base[llave], valor)
+        else: 
+            base[llave] = valor
+    return base
+
+def escribir_config(directorio: Path, entrada: Path, nombre: str='config.yaml', cambios: Dict[str, Any]=None) -> Path: 
+    #Se parte del config.yaml del sprint y solo se cambian rutas y las secciones pedidas
+    with open(SPRINT / 'config.yaml', 'r') as f: 
+        config = yaml.safe_load(f)
+    
+    config['Paths'] = {
+        'input_file': str(entrada),
+        'output_file': str(directorio / 'salida.parquet'),
+        'cache_dir': str(directorio / 'cache')
+    }
+    config['Incremental_Params']['state_file'] = str(directorio / 'estado' / 'estado.json')
+    actualizar(config, cambios or {})
+    
+    ruta = directorio / nombre
+    with open(ruta, 'w') as f: 
+        yaml.safe_dump(config, f)
+    return ruta
+
+@pytest.fixture
+def csv_juegos(tmp_path: Path) -> Path: 
+    ruta = tmp_path / 'juegos.csv'
+    datos_juegos().write_csv(ruta)
+    return ruta
+
+@pytest.fixture
+def config_juegos(tmp_path: Path, csv_juegos: Path) -> Path: 
+    return escribir_config(directorio=tmp_path, entrada=csv_juegos)
+
+@pytest.fixture
+def modelo_juegos(config_juegos: Path): 
+    from ReadFile import ReadConfig
+    return ReadConfig(archivo=str(config_juegos), usar_cache=False).read_config()
@@ -0,0 +1,81 @@
+#Importamos las librerías necesarias
+import os
+import polars as pl
+import pytest
+from pathlib import Path
+from DataPreProcessing import RenameColumn, FrameUtils
+from AnalysisFrame import AnalysisStage
+from ReadFile import ReadConfig
+from conftest import escribir_config
+
+def escribir_salida(modelo, filas: int=None) -> Path: 
+    #La salida limpia se simula con la entrada renombrada, alcanza para los group_by del análisis
+    frame = RenameColumn(frame=pl.read_csv(modelo.Paths.input_file, null_values=['tbd']), model=modelo).rename_columns()
+    salida = Path(modelo.Paths.output_file)
+    (frame if filas is None else frame.head(filas)).write_parquet(salida)
+    return salida
+
+def directorios_cache(salida: Path) -> set: 
+    return {ruta.name for ruta in salida.parent.glob(f'{salida.stem}_analisis-*')}
+
+def test_solo_lectura_carga_config_con_salida(config_juegos, modelo_juegos): 
+    escribir_salida(modelo=modelo_juegos)
+    
+    with pytest.raises(FileExistsError): 
+        ReadConfig(archivo=str(config_juegos), usar_cache=False).read_config()
+    assert ReadConfig(archivo=str(config_juegos), usar_cache=False, solo_lectura=True).read_config() is not None
+
+def test_cache_se_invalida_al_cambiar_la_salida(modelo_juegos): 
+    salida = escribir_salida(modelo=modelo_juegos)
+    stage = AnalysisStage(model=modelo_juegos)
+    
+    resultados = stage.pipeline_analisis()
+    assert len(directorios_cache(salida)) == 1
+    assert stage.pipeline_analisis()['top_plataformas'].equals(resultados['top_plataformas'])
+    assert len(directorios_cache(salida)) == 1
+    
+    #Otra salida (tamaño y mtime distintos) no puede leer los resultados anteriores
+    escribir_salida(modelo=modelo_juegos, filas=100)
+    os.utime(salida, ns=(0, 1))
+    assert stage.pipeline_analisis()['top_plataformas']['ventas'].sum() < resultados['top_plataformas']['ventas'].sum()
+    assert len(directorios_cache(salida)) == 2
+
+def test_frame_externo_no_usa_la_cache_de_la_salida(modelo_juegos): 
+    salida = escribir_salida(modelo=modelo_juegos)
+    stage = AnalysisStage(model=modelo_juegos)
+    completo = stage.pipeline_analisis()
+    
+    #Un frame distinto sin fuente se analiza siempre y no escribe cache
+    muestra = pl.scan_parquet(salida).head(50)
+    resultados = stage.pipeline_analisis(frame=muestra)
+    assert not resultados['top_plataformas'].equals(completo['top_plataformas'])
+    assert len(directorios_cache(salida)) == 1
+    
+    #Con fuente la llave incluye el plan, la muestra no choca con la salida completa
+    assert stage.pipeline_analisis(frame=muestra, fuente=salida)['top_plataformas'].equals(resultados['top_plataformas'])
+    assert len(directorios_cache(salida)) == 2
+
+def test_columnas_de_grupos_salen_del_config(tmp_path, csv_juegos): 
+    #Con otros nombres para plataforma y género el análisis agrupa por las columnas de las pruebas
+    cambios = {
+        'Cleaning_Rules': {'column_rename': {'Platform': 'consola', 'Genre': 'genero'}}, 
+        'Hypotesis_Testing': {'test_1': {'group_column': 'consola'}, 'test_2': {'group_column': 'genero'}}
+    }
+    config = escribir_config(directorio=tmp_path, entrada=csv_juegos, cambios=cambios)
+    modelo = ReadConfig(archivo=str(config), usar_cache=False).read_config()
+    escribir_salida(modelo=modelo)
+    
+    resultados = AnalysisStage(model=modelo).pipeline_analisis()
+    assert 'consola' in resultados['top_plataformas'].columns
+    assert 'genero' in resultados['top_generos_na_sales'].columns
+
+def test_ventas_prefieren_el_total_existente(modelo_juegos): 
+    stage = AnalysisStage(model=modelo_juegos)
+    frame = pl.LazyFrame({'na_sales': [1.0], 'eu_sales': [2.0], 'jp_sales': [3.0], 'other_sales': [4.0], 'total_sales': [10.0]})
+    assert frame.select(stage.expr_ventas(columnas=FrameUtils.columnas(frame))).collect().item() == 10.0
+    
+    #Sin la columna de Feature_Engineer se usa total_sales si el frame la trae, y solo sin ella la suma de regiones
+    stage.feature.operacion = 'mean'
+    stage.feature.nombre = 'mean_sales'
+    assert frame.select(stage.expr_ventas(columnas=FrameUtils.columnas(frame))).collect().item() == 10.0
+    assert frame.select(stage.expr_ventas(columnas=['na_sales', 'eu_sales', 'jp_sales'])).collect().item() == 6.0
@@ -0,0 +1,77 @@
+#Importamos las librerías necesarias
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from BatchCleaning import BatchCleaning, hilos_trabajadores, limpiar_config
+from conftest import datos_juegos, escribir_config
+
+MB = 1024**2
+
+class Futuro: 
+    def __init__(self, trabajo: dict):
+        self.trabajo = trabajo
+    
+    def result(self) -> dict: 
+        return {'archivo': self.trabajo['archivo'], 'estado': 'completado'}
+
+def correr_lote(memorias: list, memoria_maxima_mb: int, max_workers: int=4) -> list: 
+    #Los trabajos terminan de a uno en el orden en que se lanzaron, se registra lo que había en curso en cada lanzamiento
+    lote = BatchCleaning(configs='.', columnas_representativas=['platform'], max_workers=max_workers, memoria_maxima_mb=memoria_maxima_mb)
+    lanzados = []
+    en_curso = []
+    
+    def lanzar(trabajo: dict) -> Futuro: 
+        en_curso.append(trabajo['archivo'])
+        lanzados.append((trabajo['archivo'], lote.parametros(trabajo)['memoria_maxima_mb'], list(en_curso)))
+        return Futuro(trabajo)
+    
+    def esperar(futuros: list) -> list: 
+        en_curso.remove(futuros[0].trabajo['archivo'])
+        return [futuros[0]]
+    
+    trabajos = [{'archivo': f'config_{memoria}.yaml', 'memoria': memoria*MB} for memoria in memorias]
+    resultados = lote.planificar(trabajos=trabajos, lanzar=lanzar, esperar=esperar)
+    assert all(resultado['estado'] == 'completado' for resultado in resultados.values())
+    return lanzados
+
+def test_trabajos_grandes_primero_y_chicos_rellenan(): 
+    lanzados = correr_lote(memorias=[10, 50, 30, 60], memoria_maxima_mb=100)
+    
+    #60 MB ocupa el presupuesto, 50 no entra y 30 y 10 rellenan lo que queda
+    assert [archivo for archivo, _, _ in lanzados] == ['config_60.yaml', 'config_30.yaml', 'config_10.yaml', 'config_50.yaml']
+    assert [presupuesto for _, presupuesto, _ in lanzados] == [100, 40, 10, 60]
+    for _, _, en_curso in lanzados: 
+        assert sum(int(archivo.split('_')[1].split('.')[0]) for archivo in en_curso) <= 100
+
+def test_trabajo_mas_grande_que_el_presupuesto_corre_solo(): 
+    lanzados = correr_lote(memorias=[150, 20], memoria_maxima_mb=100)
+    
+    assert lanzados[0] == ('config_150.yaml', 100, ['config_150.yaml'])
+    assert lanzados[1] == ('config_20.yaml', 100, ['config_20.yaml'])
+
+def test_max_workers_limita_los_trabajos_en_curso(): 
+    lanzados = correr_lote(memorias=[10, 10, 10], memoria_maxima_mb=100, max_workers=2)
+    assert max(len(en_curso) for _, _, en_curso in lanzados) == 2
+
+def test_presupuesto_del_trabajo_llega_a_frame_collector(tmp_path): 
+    entrada = tmp_path / 'juegos.csv'
+    datos_juegos(filas=30000).write_csv(entrada)
+    config = escribir_config(directorio=tmp_path, entrada=entrada)
+    
+    #Con 1 MB el archivo no cabe en la memoria del trabajo y se limpia en streaming
+    resultado = limpiar_config(archivo=str(config), columnas_representativas=['platform'], memoria_maxima_mb=1)
+    assert resultado['estado'] == 'completado'
+    assert resultado['modo'] == 'streaming'
+
+def test_hilos_solo_en_los_trabajadores(monkeypatch): 
+    monkeypatch.delenv('POLARS_MAX_THREADS', raising=False)
+    
+    with hilos_trabajadores(hilos=2), ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool: 
+        assert pool.submit(os.getenv, 'POLARS_MAX_THREADS').result() == '2'
+    assert 'POLARS_MAX_THREADS' not in os.environ
+    
+    #Un valor definido por el usuario no se pisa
+    monkeypatch.setenv('POLARS_MAX_THREADS', '5')
+    with hilos_trabajadores(hilos=2): 
+        assert os.environ['POLARS_MAX_THREADS'] == '5'
+    assert os.environ['POLARS_MAX_THREADS'] == '5'
@@ -0,0 +1,50 @@
+#Importamos las librerías necesarias
+import polars as pl
+from CacheFrame import StageCheckpoint
+from GetFrame import FrameCollector
+from DataPreProcessing import DataCleaning
+from ReadFile import ReadConfig
+from conftest import datos_juegos, escribir_config
+
+ETAPAS = [('rename_columns', ''), ('filter_rows', ''), ('null_handler', 'x')]
+
+def modelo_checkpoints(directorio, entrada): 
+    cambios = {'Checkpoint_Params': {'enabled': True, 'checkpoint_dir': str(directorio / 'checkpoints')}}
+    config = escribir_config(directorio=directorio, entrada=entrada, cambios=cambios)
+    return ReadConfig(archivo=str(config), usar_cache=False).read_config()
+
+def limpiar(model) -> pl.DataFrame: 
+    collector = FrameCollector(model=model)
+    frame = DataCleaning(frame=collector.get_frame(), model=model, modo=collector.modo).pipeline_data_cleaning(
+        columas_representativas=['platform'],
+        guardar=False
+    )
+    return frame.lazy().collect()
+
+def test_ultima_etapa_guardada(tmp_path, csv_juegos): 
+    checkpoint = StageCheckpoint(model=modelo_checkpoints(tmp_path, csv_juegos))
+    assert checkpoint.ultima_etapa(etapas=ETAPAS) == -1
+    
+    frame = pl.DataFrame({'a': [1, 2]})
+    checkpoint.guardar(frame=frame, etapa='filter_rows')
+    assert checkpoint.ultima_etapa(etapas=ETAPAS) == 1
+    assert checkpoint.leer(etapa='filter_rows', lazy=False).equals(frame)
+    #Otros parámetros de la etapa no reutilizan el checkpoint
+    checkpoint.guardar(frame=frame, etapa='null_handler', parametros='y')
+    assert checkpoint.ultima_etapa(etapas=ETAPAS) == 1
+
+def test_reanudar_da_el_mismo_frame(tmp_path, csv_juegos): 
+    model = modelo_checkpoints(tmp_path, csv_juegos)
+    completo = limpiar(model)
+    guardados = sorted(ruta.name.split('-')[0] for ruta in (tmp_path / 'checkpoints').iterdir())
+    assert guardados == ['filter_rows', 'null_handler', 'rename_columns']
+    
+    #La segunda corrida lee el checkpoint de null_handler, las etapas previas no se vuelven a calcular
+    for ruta in (tmp_path / 'checkpoints').glob('rename_columns-*'): 
+        ruta.unlink()
+    assert limpiar(model).equals(completo)
+    assert not list((tmp_path / 'checkpoints').glob('rename_columns-*'))
+    
+    #Una entrada distinta cambia la huella y no puede reanudar
+    datos_juegos(filas=300).write_csv(csv_juegos)
+    assert limpiar(model).height != completo.height
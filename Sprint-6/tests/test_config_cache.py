@@ -0,0 +1,59 @@
+#Importamos las librerías necesarias
+import pytest
+from pathlib import Path
+from ReadFile import ReadConfig, ConfigCache
+from conftest import datos_juegos
+
+def test_cache_reutiliza_el_modelo_como_json(config_juegos): 
+    lector = ReadConfig(archivo=str(config_juegos))
+    modelo = lector.read_config()
+    
+    rutas = list(lector.cache.directorio.iterdir())
+    assert [ruta.suffix for ruta in rutas] == ['.json']
+    assert lector.cache.leer() == modelo
+    assert ReadConfig(archivo=str(config_juegos)).read_config() == modelo
+
+def test_cache_falla_si_cambia_la_entrada(config_juegos, csv_juegos): 
+    lector = ReadConfig(archivo=str(config_juegos))
+    lector.read_config()
+    assert lector.cache.leer() is not None
+    
+    datos_juegos(filas=300).write_csv(csv_juegos)
+    assert lector.cache.leer() is None
+
+def test_cache_vuelve_a_revisar_la_salida(config_juegos, modelo_juegos): 
+    ReadConfig(archivo=str(config_juegos)).read_config()
+    with open(modelo_juegos.Paths.output_file, 'w') as f: 
+        f.write('')
+    
+    with pytest.raises(FileExistsError): 
+        ReadConfig(archivo=str(config_juegos)).read_config()
+    assert ReadConfig(archivo=str(config_juegos), solo_lectura=True).read_config() is not None
+
+def test_cache_corrupta_o_sin_permisos_no_rompe_la_lectura(config_juegos): 
+    lector = ReadConfig(archivo=str(config_juegos))
+    lector.read_config()
+    lector.cache.ruta_cache().write_text('no es json')
+    assert lector.cache.leer() is None
+    assert lector.read_config() is not None
+    
+    #Si el directorio de la cache no se puede crear la corrida sigue sin cache
+    for ruta in lector.cache.directorio.iterdir(): 
+        ruta.unlink()
+    lector.cache.directorio.rmdir()
+    lector.cache.directorio.write_text('')
+    assert lector.read_config() is not None
+
+def test_version_esquema_incluye_los_modulos_importados(): 
+    nombres = {ruta.name for ruta in ConfigCache.modulos_esquema()}
+    assert {'ValidatorConfig.py', 'CheckFrame.py', 'SourceFrame.py', 'CacheFrame.py', 'Strategies.py', 'SchemaFrame.py'} <= nombres
+
+def test_cambio_en_un_modulo_importado_invalida_la_cache(config_juegos, monkeypatch): 
+    lector = ReadConfig(archivo=str(config_juegos))
+    lector.read_config()
+    assert lector.cache.leer() is not None
+    
+    #Se simula una edición de CheckFrame.py sin tocar el archivo real
+    leer_bytes = Path.read_bytes
+    monkeypatch.setattr(Path, 'read_bytes', lambda ruta: leer_bytes(ruta) + (b'#cambio' if ruta.name == 'CheckFrame.py' else b''))
+    assert lector.cache.leer() is None
@@ -0,0 +1,35 @@
+#Importamos las librerías necesarias
+import polars as pl
+import pytest
+from pydantic import ValidationError
+from CheckFrame import DataCheck
+from SourceFrame import InputSource
+from ReadFile import ReadConfig
+from conftest import datos_juegos, escribir_config
+
+def leer(directorio, entrada, cambios): 
+    config = escribir_config(directorio=directorio, entrada=entrada, cambios=cambios)
+    return ReadConfig(archivo=str(config), usar_cache=False).read_config()
+
+def test_categoria_faltante_falla_al_validar(tmp_path, csv_juegos): 
+    with pytest.raises(ValidationError, match='GBA'): 
+        leer(tmp_path, csv_juegos, {'Hypotesis_Testing': {'test_2': {'groups': ['Action', 'GBA']}}})
+    with pytest.raises(ValidationError, match='DS'): 
+        leer(tmp_path, csv_juegos, {'Analysis_Params': {'popular_platform_corr': 'DS'}})
+
+def test_metrica_sin_valores_falla_al_validar(tmp_path): 
+    entrada = tmp_path / 'juegos.csv'
+    datos_juegos().with_columns(pl.lit('tbd').alias('User_Score')).write_csv(entrada)
+    with pytest.raises(ValidationError, match='user_score'): 
+        leer(tmp_path, entrada, {})
+
+def test_revision_ve_todo_el_archivo(tmp_path, modelo_juegos): 
+    #Una categoría que solo aparece en la última fila también cuenta
+    entrada = tmp_path / 'ultima.csv'
+    datos = datos_juegos()
+    pl.concat([datos, datos.tail(1).with_columns(pl.lit('DS').alias('Platform'))]).write_csv(entrada)
+    
+    modelo_juegos.Analysis_Params.popular_platform_corr = 'DS'
+    DataCheck(model=modelo_juegos).revisar_archivo(archivo=InputSource(entrada))
+    with pytest.raises(ValueError, match='DS'): 
+        DataCheck(model=modelo_juegos).revisar_archivo(archivo=InputSource(modelo_juegos.Paths.input_file))
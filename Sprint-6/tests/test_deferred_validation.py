@@ -0,0 +1,92 @@
+#Importamos las librerías necesarias
+import polars as pl
+import pytest
+from ReadFile import ReadConfig
+from GetFrame import FrameCollector
+from CheckFrame import DataCheck
+from DataPreProcessing import DataCleaning, RenameColumn, FilterRows, NullProfile, FrameUtils
+from IncrementalCleaning import IncrementalDataCleaning, WatermarkState
+from conftest import datos_juegos, escribir_config
+
+def limpiar(config) -> pl.DataFrame: 
+    model = ReadConfig(archivo=str(config), usar_cache=False).read_config()
+    collector = FrameCollector(model=model)
+    return DataCleaning(frame=collector.get_frame(), model=model, modo=collector.modo, reutilizar_decisiones=True).pipeline_data_cleaning(
+        columas_representativas=['platform'],
+        guardar=False
+    )
+
+def config_filtrado(directorio, deferred: bool, grupos=None): 
+    #PC solo aparece antes del año de inicio, el filtro de años lo deja fuera del frame limpio
+    datos = datos_juegos().with_columns(
+        pl.when(pl.col('Platform') == 'PC').then(2005).otherwise(pl.col('Year_of_Release').fill_null(2014)).alias('Year_of_Release')
+    )
+    entrada = directorio / 'juegos.csv'
+    datos.write_csv(entrada)
+    
+    cambios = {
+        'Analysis_Params': {'relevant_year_start': 2012, 'year_column': 'year_of_release', 'keep_null_years': False},
+        'Validation_Params': {'deferred': deferred}
+    }
+    if grupos is not None: 
+        cambios['Hypotesis_Testing'] = {'test_1': {'groups': grupos}}
+    return escribir_config(directorio=directorio, entrada=entrada, nombre=f'config_{deferred}.yaml', cambios=cambios)
+
+def test_diferida_revisa_la_entrada_sin_filtrar(tmp_path): 
+    #La validación al leer el config ve PC en la entrada completa, la diferida debe dar lo mismo
+    ReadConfig(archivo=str(config_filtrado(tmp_path, deferred=False)), usar_cache=False).read_config()
+    
+    frame = limpiar(config_filtrado(tmp_path, deferred=True))
+    assert frame.height > 0
+    assert 'PC' not in frame['platform'].to_list()
+
+def test_diferida_falla_antes_de_guardar_decisiones(tmp_path): 
+    config = config_filtrado(tmp_path, deferred=True, grupos=['XOne', 'GBA'])
+    
+    with pytest.raises(ValueError, match='GBA'): 
+        limpiar(config)
+    assert not list((tmp_path / 'cache').glob('plan-*.json'))
+
+def test_checks_van_en_el_perfil_de_nulos(tmp_path, monkeypatch): 
+    #La validación diferida no lanza un scan propio, los checks se resuelven en el select del perfil
+    def scan_prohibido(*args, **kwargs): 
+        raise AssertionError('Se revisó la entrada con un scan aparte')
+    monkeypatch.setattr(DataCheck, 'revisar_archivo', scan_prohibido)
+    
+    frame = limpiar(config_filtrado(tmp_path, deferred=True))
+    assert 'PC' not in frame['platform'].to_list()
+    with pytest.raises(ValueError, match='GBA'): 
+        limpiar(config_filtrado(tmp_path, deferred=True, grupos=['XOne', 'GBA']))
+
+def test_perfil_filtrado_igual_al_perfil_del_frame_filtrado(tmp_path): 
+    model = ReadConfig(archivo=str(config_filtrado(tmp_path, deferred=True)), usar_cache=False).read_config()
+    frame = RenameColumn(frame=FrameCollector(model=model).get_frame().lazy(), model=model).rename_columns()
+    filtrado = FilterRows(frame=frame, model=model).filter_rows()
+    
+    esperado = NullProfile(frame=filtrado).perfil_nulos(columnas_representativas=['platform'])
+    fusionado = NullProfile.perfil_validacion(frame=frame, model=model).perfil_nulos(columnas_representativas=['platform'])
+    assert fusionado == esperado
+    assert esperado[0] < FrameUtils.altura(frame)
+
+def test_incremental_revisa_los_checks_en_la_primera_corrida(tmp_path): 
+    config = config_filtrado(tmp_path, deferred=True, grupos=['XOne', 'GBA'])
+    model = ReadConfig(archivo=str(config), usar_cache=False).read_config()
+    model.Incremental_Params.enabled = True
+    
+    with pytest.raises(ValueError, match='GBA'): 
+        IncrementalDataCleaning(model=model).pipeline_incremental(columas_representativas=['platform'])
+    assert WatermarkState(model=model).leer_estado() is None
+
+def test_checks_diferidos_con_checkpoints(tmp_path): 
+    config = config_filtrado(tmp_path, deferred=True, grupos=['XOne', 'GBA'])
+    model = ReadConfig(archivo=str(config), usar_cache=False).read_config()
+    model.Checkpoint_Params.enabled = True
+    model.Checkpoint_Params.checkpoint_dir = str(tmp_path / 'checkpoints')
+    
+    collector = FrameCollector(model=model)
+    with pytest.raises(ValueError, match='GBA'): 
+        DataCleaning(frame=collector.get_frame(), model=model, modo=collector.modo, reutilizar_decisiones=True).pipeline_data_cleaning(
+            columas_representativas=['platform'],
+            guardar=False
+        )
+    assert not list((tmp_path / 'checkpoints').glob('null_handler-*'))
@@ -0,0 +1,35 @@
+#Importamos las librerías necesarias
+import polars as pl
+from Strategies import StrategyFE
+from DataPreProcessing import DtypeOverride, RenameColumn
+
+VENTAS = ['na_sales', 'eu_sales', 'jp_sales', 'other_sales']
+
+def frame_renombrado(model) -> pl.DataFrame: 
+    #Las ventas llegan como texto para que la columna nueva dependa de los casteos del mismo with_columns
+    frame = RenameColumn(frame=pl.read_csv(model.Paths.input_file, null_values=['tbd']), model=model).rename_columns()
+    return frame.with_columns(pl.col(VENTAS).cast(pl.Utf8))
+
+def test_total_sales_en_el_mismo_paso_que_los_tipos(modelo_juegos): 
+    frame = frame_renombrado(modelo_juegos)
+    resultado = DtypeOverride(frame=frame.lazy(), model=modelo_juegos).dtype_override().collect()
+    
+    esperado = frame.select(pl.sum_horizontal(pl.col(VENTAS).cast(pl.Float32)).alias('total_sales'))
+    assert resultado['total_sales'].dtype == pl.Float32
+    assert resultado.select('total_sales').equals(esperado)
+
+def test_operacion_y_columnas_faltantes(modelo_juegos): 
+    modelo_juegos.Feature_Engineer.operation = StrategyFE.MAX
+    modelo_juegos.Feature_Engineer.output_column = None
+    frame = frame_renombrado(modelo_juegos).drop('other_sales')
+    
+    #Sin output_column el nombre sale de la operación, las columnas eliminadas en la limpieza se omiten
+    resultado = DtypeOverride(frame=frame, model=modelo_juegos).dtype_override()
+    esperado = frame.select(pl.max_horizontal(pl.col(VENTAS[:3]).cast(pl.Float32)).alias('max_sales'))
+    assert resultado.select('max_sales').equals(esperado)
+
+def test_sin_operacion_no_se_agrega_columna(modelo_juegos): 
+    modelo_juegos.Feature_Engineer.sales_column = None
+    modelo_juegos.Feature_Engineer.operation = None
+    frame = frame_renombrado(modelo_juegos)
+    assert DtypeOverride(frame=frame, model=modelo_juegos).dtype_override().columns == frame.columns
@@ -0,0 +1,44 @@
+#Importamos las librerías necesarias
+import polars as pl
+from GetFrame import ColumnProjection, FormatFrame
+from SchemaFrame import SchemaOverride
+from ReadFile import ReadConfig
+from conftest import datos_juegos, escribir_config
+
+def modelo_con_extra(directorio, cambios=None): 
+    #Una columna que ninguna etapa del config usa
+    entrada = directorio / 'juegos.csv'
+    datos_juegos().with_columns(pl.lit('x').alias('Publisher')).write_csv(entrada)
+    config = escribir_config(directorio=directorio, entrada=entrada, cambios=cambios)
+    return ReadConfig(archivo=str(config), usar_cache=False).read_config()
+
+def test_proyeccion_solo_lee_columnas_del_config(tmp_path): 
+    model = modelo_con_extra(tmp_path)
+    columnas = datos_juegos().columns
+    assert ColumnProjection(model=model).columnas_requeridas(columnas_frame=[*columnas, 'Publisher']) == columnas
+    
+    formato = FormatFrame(model=model)
+    assert formato.formato_lazy().collect_schema().names() == columnas
+    assert formato.formato_eager().columns == columnas
+
+def test_proyeccion_conserva_columnas_si_se_pide(tmp_path): 
+    model = modelo_con_extra(tmp_path, cambios={'Cleaning_Rules': {'keep_passthrough_columns': True}})
+    assert ColumnProjection(model=model).columnas_requeridas(columnas_frame=['Publisher']) is None
+    assert 'Publisher' in FormatFrame(model=model).formato_lazy().collect_schema().names()
+
+def test_csv_se_lee_con_los_tipos_de_dtype_override(tmp_path, csv_juegos): 
+    esperado = {'Year_of_Release': pl.Int32, 'NA_sales': pl.Float32, 'Critic_Score': pl.Float32, 'User_Score': pl.Float32}
+    datos = datos_juegos()
+    nulos_score = datos['User_Score'].is_null().sum() + (datos['User_Score'] == 'tbd').sum()
+    
+    #Directo del csv y desde la copia parquet de la cache, 'tbd' queda nulo al parsear sin pasar por texto
+    for cache_dir in [None, str(tmp_path / 'cache')]: 
+        cambios = {'Paths': {'cache_dir': cache_dir}, 'Analysis_Params': {'year_column': None}}
+        config = escribir_config(directorio=tmp_path, entrada=csv_juegos, cambios=cambios)
+        model = ReadConfig(archivo=str(config), usar_cache=False).read_config()
+        assert SchemaOverride(model=model).schema_original()['User_Score'] == pl.Float32
+        
+        formato = FormatFrame(model=model)
+        for frame in [formato.formato_lazy().collect(), formato.formato_eager()]: 
+            assert {col: frame.schema[col] for col in esperado} == esperado
+            assert frame['User_Score'].null_count() == nulos_score
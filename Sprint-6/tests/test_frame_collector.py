@@ -0,0 +1,27 @@
+#Importamos las librerías necesarias
+import polars as pl
+from GetFrame import FrameCollector
+from DataPreProcessing import AnalysisNullData
+
+def test_modo_segun_presupuesto_de_memoria(modelo_juegos): 
+    collector = FrameCollector(model=modelo_juegos)
+    estimado = collector.estimar_memoria()
+    assert estimado > 0
+    
+    #eager por debajo de ratio_eager, lazy por debajo de ratio_lazy y streaming por encima
+    for presupuesto, modo in [(estimado*20, 'eager'), (estimado*2, 'lazy'), (estimado, 'streaming')]: 
+        collector.memoria_disponible = lambda: presupuesto
+        assert collector.decision_frame() == modo
+
+def test_streaming_siempre_usa_join(modelo_juegos): 
+    frame = pl.LazyFrame({'platform': ['PS4', 'PC', 'PS4'], 'critic_score': [70.0, None, 80.0]})
+    
+    for modo, estrategia in [(None, 'window'), ('streaming', 'join')]: 
+        analisis = AnalysisNullData(
+            frame=frame, 
+            model=modelo_juegos, 
+            columnas_representativas=['platform'], 
+            columnas_target=['critic_score'], 
+            modo=modo
+        )
+        assert analisis.estrategia_grupo() == estrategia
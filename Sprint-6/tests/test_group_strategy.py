@@ -0,0 +1,30 @@
+#Importamos las librerías necesarias
+import polars as pl
+from DataPreProcessing import AnalysisNullData, RenameColumn
+
+def analisis(frame, model, max_grupos: int) -> AnalysisNullData: 
+    model.Cleaning_Rules.null_values.max_window_groups = max_grupos
+    return AnalysisNullData(
+        frame=frame,
+        model=model,
+        columnas_representativas=['platform', 'genre'],
+        columnas_target=['critic_score', 'user_score', 'rating']
+    )
+
+def frame_renombrado(model) -> pl.LazyFrame: 
+    frame = RenameColumn(frame=pl.scan_csv(model.Paths.input_file, null_values=['tbd']), model=model).rename_columns()
+    return frame.with_columns(pl.col('user_score').cast(pl.Float32))
+
+def test_estrategia_segun_los_grupos_estimados(modelo_juegos): 
+    frame = frame_renombrado(modelo_juegos)
+    #4 plataformas por 3 géneros más los géneros nulos
+    assert analisis(frame, modelo_juegos, max_grupos=100000).estrategia_grupo() == 'window'
+    assert analisis(frame, modelo_juegos, max_grupos=5).estrategia_grupo() == 'join'
+
+def test_join_y_ventanas_imputan_igual(modelo_juegos): 
+    frame = frame_renombrado(modelo_juegos)
+    
+    ventanas = analisis(frame, modelo_juegos, max_grupos=100000).analysis_null_window().collect()
+    join = analisis(frame, modelo_juegos, max_grupos=0).analysis_null_join().collect()
+    assert join.equals(ventanas)
+    assert ventanas['critic_score'].null_count() < frame.select(pl.col('critic_score').null_count()).collect().item()
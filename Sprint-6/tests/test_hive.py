@@ -0,0 +1,46 @@
+#Importamos las librerías necesarias
+import polars as pl
+import pytest
+from pathlib import Path
+from pydantic import ValidationError
+from GetFrame import FormatFrame
+from ReadFile import ReadConfig
+from conftest import datos_juegos, escribir_config
+
+def escribir_hive(directorio: Path, llave: str, quitar: bool=True) -> Path: 
+    #Un archivo parquet por plataforma en carpetas llave=valor
+    datos = datos_juegos()
+    for (plataforma,), grupo in datos.group_by('Platform'): 
+        carpeta = directorio / 'datos' / f'{llave}={plataforma}'
+        carpeta.mkdir(parents=True, exist_ok=True)
+        (grupo.drop('Platform') if quitar else grupo).write_parquet(carpeta / 'parte.parquet')
+    return directorio / 'datos'
+
+def test_lectura_hive_agrega_la_columna_de_particion(tmp_path): 
+    entrada = escribir_hive(directorio=tmp_path, llave='Platform')
+    config = escribir_config(directorio=tmp_path, entrada=entrada, cambios={'Analysis_Params': {'year_column': None}})
+    model = ReadConfig(archivo=str(config), usar_cache=False).read_config()
+    
+    frame = FormatFrame(model=model).formato_lazy().collect()
+    assert frame.height == 400
+    assert 'Platform' in frame.columns
+    assert sorted(frame['Platform'].unique().to_list()) == ['PC', 'PS4', 'Wii', 'XOne']
+
+def test_shards_csv_agregan_la_columna_de_particion(tmp_path): 
+    datos = datos_juegos()
+    for (plataforma,), grupo in datos.group_by('Platform'): 
+        carpeta = tmp_path / 'datos' / f'Platform={plataforma}'
+        carpeta.mkdir(parents=True)
+        grupo.drop('Platform').write_csv(carpeta / 'parte.csv')
+    config = escribir_config(directorio=tmp_path, entrada=tmp_path / 'datos', cambios={'Paths': {'cache_dir': None}, 'Analysis_Params': {'year_column': None}})
+    model = ReadConfig(archivo=str(config), usar_cache=False).read_config()
+    
+    frame = FormatFrame(model=model).formato_lazy().collect()
+    assert frame.group_by('Platform').len().sort('Platform')['len'].to_list() == [100, 100, 100, 100]
+
+def test_llave_hive_igual_a_un_renombrado_falla_en_la_validacion(tmp_path): 
+    #La llave hive 'platform' choca con el renombrado Platform -> platform
+    entrada = escribir_hive(directorio=tmp_path, llave='platform', quitar=False)
+    config = escribir_config(directorio=tmp_path, entrada=entrada)
+    with pytest.raises(ValidationError, match='llave de partición hive'): 
+        ReadConfig(archivo=str(config), usar_cache=False).read_config()
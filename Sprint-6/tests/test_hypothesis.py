@@ -0,0 +1,39 @@
+#Importamos las librerías necesarias
+import math
+import polars as pl
+import pytest
+from pydantic import ValidationError
+from HypothesisFrame import TStudent, HypothesisTest
+import ValidatorConfig
+
+def test_p_valor_con_beta_incompleta(): 
+    #Valor de tablas: t=2 con 10 grados de libertad, dos colas
+    assert TStudent.p_valor(t=2, grados=10) == pytest.approx(0.0734, abs=1e-4)
+    assert TStudent.p_valor(t=-2, grados=10) == pytest.approx(TStudent.p_valor(t=2, grados=10))
+    assert TStudent.beta_incompleta(a=1, b=1, x=0.3) == pytest.approx(0.3)
+    assert TStudent.beta_incompleta(a=4.5, b=4.5, x=0.5) == pytest.approx(0.5)
+
+def test_welch_caso_conocido(modelo_juegos): 
+    frame = pl.DataFrame({
+        'platform': ['A']*5 + ['B']*5,
+        'genre': ['X', 'Y']*5,
+        'user_score': [1.0, 2.0, 3.0, 4.0, 5.0, 2.0, 4.0, 6.0, 8.0, 10.0]
+    })
+    modelo_juegos.Hypotesis_Testing.test_1.groups = ['A', 'B']
+    modelo_juegos.Hypotesis_Testing.test_1.metric = 'user_score'
+    #La segunda prueba repite los grupos de la primera, sus alias no pueden chocar
+    modelo_juegos.Hypotesis_Testing.test_2 = modelo_juegos.Hypotesis_Testing.test_1.model_copy(update={'name': 'repetida'})
+    
+    resultados = HypothesisTest(model=modelo_juegos).resultados(frame=frame)
+    assert resultados.height == 2
+    
+    #Medias 3 y 6, varianzas 2.5 y 10: t = -3/sqrt(2.5), grados = 6.25/(0.0625 + 1)
+    fila = resultados.row(0, named=True)
+    assert fila['t'] == pytest.approx(-3/math.sqrt(2.5))
+    assert fila['grados_libertad'] == pytest.approx(6.25/1.0625)
+    assert 0.05 < fila['p_valor'] < 0.15
+    assert resultados.row(1, named=True)['p_valor'] == fila['p_valor']
+
+def test_grupos_repetidos_no_se_aceptan(): 
+    with pytest.raises(ValidationError, match='repetidos'): 
+        ValidatorConfig.TestValidator(name='prueba', groups=['PS4', 'PC', 'PS4'], metric='user_score')
@@ -0,0 +1,137 @@
+#Importamos las librerías necesarias
+import polars as pl
+import pytest
+from ReadFile import ReadConfig
+from DataPreProcessing import FrameUtils
+from IncrementalCleaning import WatermarkState, DeltaFrame, FittedNullHandler, IncrementalDataCleaning
+from conftest import datos_juegos, escribir_config
+
+def modelo_incremental(directorio, entrada, watermark: str='filas', columna: str='year_of_release'): 
+    #Sin filtro de años el watermark por filas cuenta todas las filas de la entrada
+    cambios = {
+        'Incremental_Params': {'enabled': True, 'watermark': watermark, 'watermark_column': columna},
+        'Analysis_Params': {'year_column': None}
+    }
+    config = escribir_config(directorio=directorio, entrada=entrada, cambios=cambios)
+    return ReadConfig(archivo=str(config), usar_cache=False).read_config()
+
+def test_estado_ida_y_vuelta(modelo_juegos): 
+    estado = WatermarkState(model=modelo_juegos)
+    assert estado.leer_estado() is None
+    
+    estadisticas = pl.DataFrame({'platform': ['PS4', None], 'media_critic_score': [70.5, 60.0]})
+    estado.guardar_estado(estado={'watermark': 120, 'lote': 0, 'decisiones': {'umbral': 0.4}}, estadisticas=estadisticas)
+    assert estado.leer_estado() == {'watermark': 120, 'lote': 0, 'decisiones': {'umbral': 0.4}}
+    assert estado.leer_estadisticas().equals(estadisticas)
+
+def test_watermark_por_filas_solo_lee_las_nuevas(tmp_path): 
+    entrada = tmp_path / 'juegos.csv'
+    datos = datos_juegos(filas=400)
+    datos.head(300).write_csv(entrada)
+    model = modelo_incremental(tmp_path, entrada)
+    delta = DeltaFrame(model=model)
+    
+    primero = delta.frame_delta(watermark=None)
+    watermark = delta.nuevo_watermark(delta=primero, watermark=None)
+    assert watermark == 300
+    assert FrameUtils.altura(delta.frame_delta(watermark=watermark)) == 0
+    
+    #Cada corrida arma su DeltaFrame, la cache parquet de la entrada se resuelve al crearlo
+    datos.write_csv(entrada)
+    delta = DeltaFrame(model=model)
+    nuevas = delta.frame_delta(watermark=watermark).collect()
+    assert nuevas['Name'].to_list() == datos['Name'].to_list()[300:]
+    assert delta.nuevo_watermark(delta=nuevas.lazy(), watermark=watermark) == 400
+
+def test_watermark_por_columna_usa_el_maximo(tmp_path): 
+    entrada = tmp_path / 'juegos.csv'
+    datos = datos_juegos(filas=400).with_row_index('id')
+    datos.write_csv(entrada)
+    delta = DeltaFrame(model=modelo_incremental(tmp_path, entrada, watermark='columna', columna='id'))
+    
+    assert delta.nuevo_watermark(delta=delta.frame_delta(watermark=None), watermark=None) == 399
+    nuevas = delta.frame_delta(watermark=300).collect()
+    assert nuevas['id'].to_list() == list(range(301, 400))
+    #Sin filas nuevas el watermark no retrocede
+    assert delta.nuevo_watermark(delta=nuevas.head(0).lazy(), watermark=399) == 399
+
+def test_watermark_por_columna_exige_una_llave_unica_sin_nulos(tmp_path): 
+    entrada = tmp_path / 'juegos.csv'
+    datos_juegos(filas=400).write_csv(entrada)
+    delta = DeltaFrame(model=modelo_incremental(tmp_path, entrada, watermark='columna'))
+    
+    #El año se repite y tiene nulos, con > watermark se perderían filas del último año y las de año nulo
+    with pytest.raises(ValueError, match='nulos'): 
+        delta.nuevo_watermark(delta=delta.frame_delta(watermark=2014), watermark=2014)
+    with pytest.raises(ValueError, match='repetidos'): 
+        delta.nuevo_watermark(delta=delta.frame_delta(watermark=2014).drop_nulls('Year_of_Release'), watermark=2014)
+
+def test_estadisticas_ajustadas_imputan_igual_que_la_limpieza_completa(tmp_path): 
+    entrada = tmp_path / 'juegos.csv'
+    datos_juegos(filas=400).write_csv(entrada)
+    model = modelo_incremental(tmp_path, entrada)
+    
+    for max_grupos in [100000, 0]: 
+        #La limpieza completa usa ventanas o join según los grupos, las estadísticas guardadas deben imputar lo mismo
+        model.Cleaning_Rules.null_values.max_window_groups = max_grupos
+        incremental = IncrementalDataCleaning(model=model)
+        frame = incremental.preparar_frame(frame=incremental.delta.frame_delta(watermark=None))
+        frame_limpio, decisiones, estadisticas = incremental.ajustar_limpieza(
+            frame=frame, 
+            columnas_representativas=['platform'], 
+            umbral=0.4, 
+            min_proportion=45
+        )
+        assert decisiones['columnas_analizar']
+        
+        #El estado pasa por json y parquet igual que entre corridas
+        incremental.estado.guardar_estado(estado={'watermark': 0, 'lote': 0, 'decisiones': decisiones}, estadisticas=estadisticas)
+        reutilizado = FittedNullHandler(
+            model=model, 
+            estado=incremental.estado.leer_estado()['decisiones'], 
+            estadisticas=incremental.estado.leer_estadisticas(), 
+            columnas_representativas=['platform'], 
+            min_proportion=45
+        ).pipeline_null_handler(frame=frame)
+        
+        assert reutilizado.collect().equals(frame_limpio.lazy().collect())
+
+def test_pipeline_incremental_agrega_solo_lotes_nuevos(tmp_path): 
+    entrada = tmp_path / 'juegos.csv'
+    datos = datos_juegos(filas=400)
+    datos.head(300).write_csv(entrada)
+    model = modelo_incremental(tmp_path, entrada)
+    
+    IncrementalDataCleaning(model=model).pipeline_incremental(columas_representativas=['platform'])
+    assert IncrementalDataCleaning(model=model).pipeline_incremental(columas_representativas=['platform']) is None
+    
+    datos.write_csv(entrada)
+    lote = IncrementalDataCleaning(model=model).pipeline_incremental(columas_representativas=['platform']).collect()
+    #El lote solo trae filas nuevas, las filas con demasiados nulos se siguen eliminando
+    assert set(lote['name']) <= set(datos['Name'].to_list()[300:])
+    assert lote.height > 0
+    assert sorted(ruta.name for ruta in (tmp_path / 'salida.parquet').iterdir()) == ['lote_00000.parquet', 'lote_00001.parquet']
+    assert WatermarkState(model=model).leer_estado()['watermark'] == 400
+
+def test_pipeline_incremental_por_defecto_procesa_filas_del_ultimo_año(tmp_path): 
+    #Con el config por defecto las filas agregadas en el año máximo ya procesado también entran al lote siguiente
+    entrada = tmp_path / 'juegos.csv'
+    datos = datos_juegos(filas=400)
+    datos.write_csv(entrada)
+    config = escribir_config(directorio=tmp_path, entrada=entrada, cambios={'Incremental_Params': {'enabled': True}})
+    model = ReadConfig(archivo=str(config), usar_cache=False).read_config()
+    assert model.Incremental_Params.watermark == 'filas'
+    IncrementalDataCleaning(model=model).pipeline_incremental(columas_representativas=['platform'])
+    
+    año_maximo = datos['Year_of_Release'].max()
+    agregadas = datos.head(40).with_columns(
+        pl.format('nuevo_{}', pl.col('Name')).alias('Name'), 
+        pl.lit(año_maximo, dtype=pl.Int64).alias('Year_of_Release'), 
+        pl.lit(80.0).alias('Critic_Score')
+    )
+    pl.concat([datos, agregadas]).write_csv(entrada)
+    lote = IncrementalDataCleaning(model=model).pipeline_incremental(columas_representativas=['platform']).collect()
+    
+    assert lote.height > 0
+    assert set(lote['name']) <= set(agregadas['Name'])
+    assert set(lote['year_of_release']) == {año_maximo}
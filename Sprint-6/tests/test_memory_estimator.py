@@ -0,0 +1,29 @@
+#Importamos las librerías necesarias
+import polars as pl
+import pytest
+from GetFrame import MemoryEstimator
+from DataPreProcessing import RenameColumn
+from ReadFile import ReadConfig
+from conftest import datos_juegos, escribir_config
+
+def tamaño_real(model) -> int: 
+    #Tamaño del frame completo ya renombrado y con los tipos del config
+    frame = pl.read_csv(model.Paths.input_file, null_values=model.Cleaning_Rules.null_values.null_val_csv)
+    frame = RenameColumn(frame=frame, model=model).rename_columns()
+    return frame.with_columns([pl.col(col).cast(dtype, strict=False) for col, dtype in MemoryEstimator(model=model).schema_renombrado.items() if col in frame.columns]).estimated_size()
+
+@pytest.mark.parametrize('formato', ['csv', 'parquet'])
+def test_estimacion_cercana_al_frame_decodificado(tmp_path, formato): 
+    datos = datos_juegos(filas=20000)
+    datos.write_csv(tmp_path / 'juegos.csv')
+    entrada = tmp_path / f'juegos.{formato}'
+    if formato == 'parquet': 
+        pl.read_csv(tmp_path / 'juegos.csv', infer_schema_length=None).write_parquet(entrada)
+    
+    #muestra_filas menor que el archivo obliga a proyectar las filas desde la muestra
+    config = escribir_config(directorio=tmp_path, entrada=entrada, cambios={'Memory_Params': {'muestra_filas': 2000}})
+    model = ReadConfig(archivo=str(config), usar_cache=False).read_config()
+    
+    estimado = MemoryEstimator(model=model).estimar_memoria()
+    modelo_csv = ReadConfig(archivo=str(escribir_config(directorio=tmp_path, entrada=tmp_path / 'juegos.csv', nombre='csv.yaml')), usar_cache=False).read_config()
+    assert 0.5*tamaño_real(modelo_csv) < estimado < 2*tamaño_real(modelo_csv)
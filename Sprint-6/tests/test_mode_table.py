@@ -0,0 +1,43 @@
+#Importamos las librerías necesarias
+import polars as pl
+from DataPreProcessing import ModeTable, AnalysisNullData, RenameColumn
+
+def test_moda_por_grupo_con_empate_determinista(): 
+    frame = pl.DataFrame({
+        'platform': ['PS4', 'PS4', 'PS4', 'PS4', 'PC', 'PC'],
+        'rating': ['T', 'E', 'T', 'E', 'M', None]
+    })
+    #En PS4 empatan E y T, gana el valor menor sin importar el orden de las filas
+    for orden in [frame, frame.reverse()]: 
+        moda = ModeTable(frame=orden, columnas_representativas=['platform'], columnas_cat=['rating']).tabla_moda()
+        assert dict(moda.sort('platform').iter_rows()) == {'PC': 'M', 'PS4': 'E'}
+
+def test_moda_con_columna_representativa_como_objetivo(): 
+    frame = pl.DataFrame({
+        'platform': ['PS4', 'PS4', 'PC', None],
+        'genre': ['Action', 'Action', None, 'Sports']
+    })
+    moda = ModeTable(frame=frame, columnas_representativas=['platform'], columnas_cat=['platform', 'genre']).tabla_moda()
+    
+    assert moda.columns == ['platform', 'valor_platform', 'valor_genre']
+    assert moda.filter(pl.col('platform') == 'PS4').row(0) == ('PS4', 'PS4', 'Action')
+    assert moda.filter(pl.col('platform').is_null()).row(0) == (None, None, 'Sports')
+
+def test_imputacion_con_columna_representativa_como_objetivo(modelo_juegos): 
+    frame = RenameColumn(frame=pl.read_csv(modelo_juegos.Paths.input_file, null_values=['tbd']), model=modelo_juegos).rename_columns()
+    frame = frame.with_columns(pl.when(pl.int_range(pl.len()) % 9 == 0).then(None).otherwise(pl.col('platform')).alias('platform'))
+    
+    resultados = []
+    for max_grupos in [100000, 0]: 
+        #max_window_groups=0 fuerza la estrategia join, el resultado debe coincidir con la de ventanas
+        modelo_juegos.Cleaning_Rules.null_values.max_window_groups = max_grupos
+        analisis = AnalysisNullData(
+            frame=frame,
+            model=modelo_juegos,
+            columnas_representativas=['genre'],
+            columnas_target=['platform', 'genre', 'rating']
+        )
+        resultados.append(analisis.analysis_null_data(min_proportion=0))
+    
+    assert resultados[0].equals(resultados[1])
+    assert resultados[0]['rating'].null_count() < frame['rating'].null_count()
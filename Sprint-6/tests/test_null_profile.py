@@ -0,0 +1,48 @@
+#Importamos las librerías necesarias
+import polars as pl
+from DataPreProcessing import NullProfile, TupleExprNullHanlder, DeleteData
+from conftest import datos_juegos
+
+def frame_nulos() -> pl.DataFrame: 
+    return datos_juegos().with_columns(pl.col('User_Score').replace('tbd', None))
+
+def test_perfil_igual_a_los_conteos_por_columna(): 
+    frame = frame_nulos()
+    total, nulos, filas_nulas, grupos = NullProfile(frame=frame.lazy()).perfil_nulos(umbral_filas_nulas=0.2, columnas_representativas=['Platform'])
+    
+    #Referencia con una pasada por columna, como se perfilaba antes
+    umbral = frame.width*0.2
+    sucias = frame.filter(pl.sum_horizontal(pl.all().is_null().cast(pl.Int32)) > umbral)
+    assert total == frame.height
+    assert nulos == {col: frame[col].null_count() for col in frame.columns}
+    assert filas_nulas == {col: sucias[col].null_count() for col in frame.columns}
+    assert grupos == frame['Platform'].n_unique()
+
+def test_decisiones_con_los_porcentajes_de_nulos(modelo_juegos): 
+    #Una columna casi vacía para que también haya columnas a eliminar
+    frame = frame_nulos().with_columns(pl.when(pl.int_range(pl.len()) % 5 == 0).then(pl.lit('x')).alias('Vacia'))
+    handler = TupleExprNullHanlder(frame=frame, model=modelo_juegos)
+    _, eliminar, analizar = handler.col_handler(umbral_filas=0.2)
+    
+    porcentajes = {col: frame[col].null_count()/frame.height*100 for col in frame.columns}
+    assert eliminar == ['Vacia']
+    assert eliminar == [col for col, porcentaje in porcentajes.items() if porcentaje >= 65]
+    assert sorted(analizar + handler.columnas_filas) == sorted(col for col, porcentaje in porcentajes.items() if 0 < porcentaje < 65)
+
+def test_mascara_elimina_las_mismas_filas_que_la_lista_de_indices(): 
+    frame = frame_nulos()
+    columnas = ['Critic_Score', 'Rating']
+    umbral = frame.width*0.2
+    
+    #Referencia con índices: filas sucias con nulo en alguna columna marcada
+    con_indice = frame.with_row_index('indice')
+    nulos_fila = pl.sum_horizontal(pl.all().exclude('indice').is_null().cast(pl.Int32))
+    indices = set()
+    for col in columnas: 
+        indices |= set(con_indice.filter((nulos_fila > umbral) & pl.col(col).is_null())['indice'].to_list())
+    esperado = con_indice.filter(~pl.col('indice').is_in(list(indices))).drop('indice')
+    
+    mascara = DeleteData(frame=frame).delete_row(columnas=columnas, umbral_filas=umbral)
+    assert 0 < len(indices) < frame.height
+    assert frame.filter(mascara).equals(esperado)
+    assert frame.lazy().filter(mascara).collect().equals(esperado)
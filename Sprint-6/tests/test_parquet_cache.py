@@ -0,0 +1,46 @@
+#Importamos las librerías necesarias
+import polars as pl
+from pathlib import Path
+from CacheFrame import ParquetCache
+from GetFrame import FormatFrame
+from ReadFile import ReadConfig
+from conftest import datos_juegos, escribir_config
+
+def conversiones(model) -> list: 
+    return sorted(Path(model.Paths.cache_dir).glob('*.parquet'))
+
+def test_la_validacion_no_convierte(config_juegos): 
+    model = ReadConfig(archivo=str(config_juegos), usar_cache=False).read_config()
+    assert conversiones(model) == []
+    assert ParquetCache(model=model).ruta_frame() == Path(model.Paths.input_file)
+
+def test_conversion_hit_y_miss(modelo_juegos, csv_juegos): 
+    ruta = FormatFrame(model=modelo_juegos).archivo.ruta
+    assert conversiones(modelo_juegos) == [ruta]
+    mtime = ruta.stat().st_mtime_ns
+    
+    #Hit: la misma entrada reutiliza la copia parquet sin volver a convertir
+    assert FormatFrame(model=modelo_juegos).archivo.ruta == ruta
+    assert ruta.stat().st_mtime_ns == mtime
+    assert ParquetCache(model=modelo_juegos).ruta_frame() == ruta
+    assert pl.read_parquet(ruta).height == 400
+    
+    #Miss: el csv cambió, se convierte de nuevo y la copia vieja se elimina
+    datos_juegos(filas=300).write_csv(csv_juegos)
+    nueva = FormatFrame(model=modelo_juegos).archivo.ruta
+    assert nueva != ruta
+    assert conversiones(modelo_juegos) == [nueva]
+    assert pl.read_parquet(nueva).height == 300
+
+def test_archivos_con_el_mismo_nombre_no_se_eliminan_entre_si(tmp_path): 
+    modelos = []
+    for carpeta in ['a', 'b']: 
+        (tmp_path / carpeta).mkdir()
+        entrada = tmp_path / carpeta / 'juegos.csv'
+        datos_juegos().write_csv(entrada)
+        config = escribir_config(directorio=tmp_path / carpeta, entrada=entrada, cambios={'Paths': {'cache_dir': str(tmp_path / 'cache')}})
+        modelos.append(ReadConfig(archivo=str(config), usar_cache=False).read_config())
+    
+    rutas = [FormatFrame(model=model).archivo.ruta for model in modelos]
+    assert all(ruta.exists() for ruta in rutas)
+    assert len(set(rutas)) == 2
@@ -0,0 +1,46 @@
+#Importamos las librerías necesarias
+import polars as pl
+from pathlib import Path
+from DataPreProcessing import PlanCompiler, DataCleaning, NullProfile
+
+def test_clave_cambia_con_el_frame_limpiado(modelo_juegos): 
+    compilador = PlanCompiler(model=modelo_juegos)
+    frame = pl.scan_csv(modelo_juegos.Paths.input_file, null_values=['tbd'])
+    
+    clave = compilador.clave_plan(frame=frame, columnas_representativas=['platform'])
+    assert clave == compilador.clave_plan(frame=frame, columnas_representativas=['platform'])
+    #Una muestra con el mismo schema no puede reutilizar las decisiones de la entrada completa
+    assert clave != compilador.clave_plan(frame=frame.head(50), columnas_representativas=['platform'])
+    assert clave != compilador.clave_plan(frame=frame, columnas_representativas=['genre'])
+
+def test_planes_por_instancia(modelo_juegos): 
+    frame = pl.scan_csv(modelo_juegos.Paths.input_file, null_values=['tbd'])
+    compilador = PlanCompiler(model=modelo_juegos)
+    
+    plan = compilador.compilar(frame=frame, columnas_representativas=['platform'])
+    assert compilador.compilar(frame=frame, columnas_representativas=['platform']) is plan
+    assert PlanCompiler(model=modelo_juegos).planes == {}
+
+def test_sin_reutilizar_decisiones_no_se_escriben(modelo_juegos): 
+    frame = pl.scan_csv(modelo_juegos.Paths.input_file, null_values=['tbd'])
+    compilador = PlanCompiler(model=modelo_juegos, reutilizar_decisiones=False)
+    
+    compilador.compilar(frame=frame, columnas_representativas=['platform'])
+    assert compilador.ruta_decisiones(clave='x') is None
+    assert not list(compilador.cache_dir.glob('plan-*.json'))
+
+def test_data_cleaning_reutiliza_decisiones_solo_si_se_pide(modelo_juegos, monkeypatch): 
+    frame = pl.scan_csv(modelo_juegos.Paths.input_file, null_values=['tbd'])
+    DataCleaning(frame=frame, model=modelo_juegos).compilador.compilar(frame=frame, columnas_representativas=['platform'])
+    assert not list(Path(modelo_juegos.Paths.cache_dir).glob('plan-*.json'))
+    
+    plan = DataCleaning(frame=frame, model=modelo_juegos, reutilizar_decisiones=True).compilador.compilar(frame=frame, columnas_representativas=['platform'])
+    assert len(list(Path(modelo_juegos.Paths.cache_dir).glob('plan-*.json'))) == 1
+    
+    #Otra corrida arma su propio plan con las decisiones guardadas, sin volver a perfilar el frame
+    def perfil_prohibido(*args, **kwargs): 
+        raise AssertionError('Se volvió a perfilar el frame')
+    monkeypatch.setattr(NullProfile, 'perfil_nulos', perfil_prohibido)
+    reutilizado = DataCleaning(frame=frame, model=modelo_juegos, reutilizar_decisiones=True).compilador.compilar(frame=frame, columnas_representativas=['platform'])
+    assert reutilizado is not plan
+    assert reutilizado.collect().equals(plan.collect())
@@ -0,0 +1,26 @@
+#Importamos las librerías necesarias
+import polars as pl
+import pytest
+from pydantic import ValidationError
+from GetFrame import RowFilter
+from ReadFile import ReadConfig
+from conftest import escribir_config
+
+def test_año_de_texto_falla_al_validar(tmp_path, csv_juegos): 
+    cambios = {'Cleaning_Rules': {'dtype_override': {'year_of_release': 'Utf8'}}}
+    config = escribir_config(directorio=tmp_path, entrada=csv_juegos, cambios=cambios)
+    with pytest.raises(ValidationError, match='debe ser numérica'): 
+        ReadConfig(archivo=str(config), usar_cache=False).read_config()
+    
+    #Sin filtro de años la columna puede ser texto
+    cambios['Analysis_Params'] = {'year_column': None}
+    config = escribir_config(directorio=tmp_path, entrada=csv_juegos, cambios=cambios)
+    assert ReadConfig(archivo=str(config), usar_cache=False).read_config() is not None
+
+def test_filtro_conserva_años_nulos_si_se_pide(modelo_juegos): 
+    frame = pl.DataFrame({'year_of_release': [2005, 2012, None, 2016]})
+    
+    modelo_juegos.Analysis_Params.keep_null_years = True
+    assert frame.filter(RowFilter(model=modelo_juegos).filtro_frame())['year_of_release'].to_list() == [2012, None, 2016]
+    modelo_juegos.Analysis_Params.keep_null_years = False
+    assert frame.filter(RowFilter(model=modelo_juegos).filtro_frame())['year_of_release'].to_list() == [2012, 2016]
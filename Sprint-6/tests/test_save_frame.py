@@ -0,0 +1,29 @@
+#Importamos las librerías necesarias
+import polars as pl
+from DataPreProcessing import SaveFrame
+from conftest import datos_juegos
+
+def frame_limpio() -> pl.DataFrame: 
+    return datos_juegos().rename(str.lower).drop_nulls('genre')
+
+def test_sink_lazy_devuelve_el_scan_de_la_salida(modelo_juegos, tmp_path): 
+    frame = frame_limpio()
+    save = SaveFrame(model=modelo_juegos)
+    
+    resultado = save.guardar_frame(frame=frame.lazy())
+    assert isinstance(resultado, pl.LazyFrame)
+    assert resultado.collect().equals(frame)
+    
+    #Un frame eager se devuelve tal cual, la salida csv también se escribe con sink
+    salida = tmp_path / 'salida.csv'
+    assert SaveFrame(model=modelo_juegos, archivo=salida).guardar_frame(frame=frame) is frame
+    assert pl.read_csv(salida).height == frame.height
+
+def test_salida_particionada_por_columna(modelo_juegos, tmp_path): 
+    modelo_juegos.Output_Params.partition_by = ['platform']
+    salida = tmp_path / 'particionada'
+    frame = frame_limpio()
+    
+    leido = SaveFrame(model=modelo_juegos, archivo=salida).guardar_frame(frame=frame.lazy()).collect()
+    assert sorted(ruta.name for ruta in salida.iterdir()) == ['platform=PC', 'platform=PS4', 'platform=Wii', 'platform=XOne']
+    assert leido.sort('name').select(frame.columns).equals(frame.sort('name'))
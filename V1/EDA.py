@@ -2,8 +2,6 @@
 import polars as pl
 from typing import Optional
 import itertools
-from rapidfuzz import fuzz
-from sklearn.ensemble import IsolationForest
 import logging
 
 #Configuración del logging
@@ -235,6 +233,8 @@ def coincidencia_aproximada(nombre_archivo: str,
     
     logger.info('--- Coincidencia aproximada ---')
     
+    from rapidfuzz import fuzz
+    
     pares_comparacion = itertools.combinations(valores_unicos, 2)
     for val1, val2 in pares_comparacion: 
         puntaje = fuzz.token_set_ratio(val1, val2)
@@ -361,6 +361,8 @@ def outlier(nombre_archivo:str,
         logger.error(f'El DataFrame del archivo "{nombre_archivo}" no contiene columnas numéricas (Int64 o Float64) para detectar outliers. Saltando detección de outliers.')
         return None
     
+    from sklearn.ensemble import IsolationForest
+    
     try: 
         mod = IsolationForest(contamination=contaminacion, random_state=42)
         pred = mod.fit_predict(x)
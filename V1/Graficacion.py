@@ -1,8 +1,9 @@
 #Importación de las librerías necesarias
+from __future__ import annotations
 import polars as pl
-import plotly.express as px
-from plotly.graph_objects import Figure
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
+if TYPE_CHECKING: 
+    from plotly.graph_objects import Figure
 import logging
 from Columnas_por_tipo import num_cat_col
 
@@ -34,6 +35,7 @@ class Graficacion:
     def grafico_lineas(self, x: str, y: str, 
                         titulo: str, x_title : str, y_title:str, 
                         columna_categorica: Optional[str]=None) -> Optional[Figure]: 
+        import plotly.express as px
         
         if x not in self.df.columns:
             logger.error(f'La columna {x} no está en el DataFrame')
@@ -74,6 +76,7 @@ class Graficacion:
     def grafico_barras(self, x: str, y: str,
                         titulo:str, x_title:str, y_title: str, 
                         columna_categorica: Optional[str]=None) -> Optional[Figure]: 
+        import plotly.express as px
         if x not in self.df.columns: 
             logger.error(f'La columna {x} no está en el DataFrame')
             return None
@@ -114,6 +117,7 @@ class Graficacion:
                             size: str, titulo: str, 
                             x_title: str, y_title: str, 
                             columna_categorica: Optional[str]=None) -> Optional[Figure]: 
+        import plotly.express as px
         if x not in self.columna_numerica:
             logger.error(f'La columna {x} no está en las columnas numericas')
             return None
@@ -159,6 +163,7 @@ class Graficacion:
     def boxplot(self, x: str, y: str, 
                 titulo: str, x_title:str, y_title:str, 
                 columna_categorica:Optional[str]=None) -> Optional[Figure]: 
+        import plotly.express as px
         if x not in self.df.columns: 
             logger.error(f'La columna {x} no está en el DataFrame')
             return None
@@ -198,6 +203,7 @@ class Graficacion:
     def grafica_histograma(self, x:str, 
                 titulo: str, x_title: str, y_title: str, 
                 nbins: int=50, columna_categorica: Optional[str] = None) -> Optional[Figure]:
+        import plotly.express as px
         if x not in self.df.columns: 
             logger.error(f'La columna {x} no está en el DataFrame')
             return None
@@ -1,9 +1,10 @@
 #Importación de librerías extra necesariass
+from __future__ import annotations
 import polars as pl
 import logging
-from typing import Union, Optional
-from plotly.graph_objects import Figure
-from scipy.stats import ttest_ind, ttest_1samp, ttest_rel, shapiro
+from typing import TYPE_CHECKING, Union, Optional
+if TYPE_CHECKING: 
+    from plotly.graph_objects import Figure
 #EDA
 from EDA import estadisticas_descriptivas
 #Grficas
@@ -132,6 +133,7 @@ class Explorar_y_Formacion_Hipotesis:
             logger.error(f'El valor {valor_normal} no tiene suficientes datos para verificar la normalidad')
             return None
         
+        from scipy.stats import shapiro
         stat, p_value = shapiro(normalidad)
         
         diccionario = {
@@ -280,6 +282,7 @@ class Explorar_y_Formacion_Hipotesis:
             logger.warning('No se puede realizar la prueba t de dos muestras con menos de 2 datos por grupo')
             return None
         
+        from scipy.stats import ttest_ind
         t_stat, p_value = ttest_ind(grupo1_datos, grupo2_datos, alternative=alternativa, equal_var=False)
         
         if p_value < 0.05: 
@@ -340,6 +343,7 @@ class Explorar_y_Formacion_Hipotesis:
             logger.warning('No se puede realizar la prueba t de una muestra con menos de 2 datos')
             return None
         
+        from scipy.stats import ttest_1samp
         t_stat, p_value = ttest_1samp(datos, popmean=valor_media, alternative=alternativa)
         if p_value < 0.05: 
             if alternativa == 'greater': 
@@ -400,6 +404,7 @@ class Explorar_y_Formacion_Hipotesis:
             logger.error('No se puede realizar la prueba t de una muestra pareada con menos de 2 datos')
             return None
         
+        from scipy.stats import ttest_rel
         t_stat, p_value = ttest_rel(antes, despues, alternative=alternativa)
         if p_value < 0.05: 
             if alternativa == 'greater': 
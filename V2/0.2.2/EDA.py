@@ -1,6 +1,5 @@
 #Importación de las liberarías necesarias
 import polars as pl
-from sklearn.ensemble import IsolationForest
 import logging
 from dataclasses import dataclass
 from ColumnAnalyzer import ColumnAnalyzer
@@ -84,6 +83,7 @@ class NumericalEDA:
         logger.info(f'Vista previa general: \n {self.df_numerico.describe()}')
     
     def outlier(self, max_val: int=10, contaminacion: float=0.01) -> None:
+        from sklearn.ensemble import IsolationForest
         x = self.df_numerico.to_numpy()
         
         try: 